@@ -3,23 +3,38 @@
 Simple deployment script for PyVault Agent to PyPI.
 """
 
+import glob
+import shlex
+import shutil
 import subprocess
 import sys
 import os
 
 
-def run_command(command):
-    """Run a shell command."""
-    print(f"$ {command}")
-    result = subprocess.run(command, shell=True)
-    if result.returncode != 0:
+def run_command(argv, check=True, env=None):
+    """Run a command without an intermediate shell."""
+    print(f"$ {shlex.join(argv)}")
+    result = subprocess.run(argv, shell=False, env=env)
+    if check and result.returncode != 0:
         print(f"Command failed with exit code {result.returncode}")
         sys.exit(1)
+    return result
+
+
+def check_tools(tools):
+    """Exit early if any required tool is missing from PATH."""
+    missing = [tool for tool in tools if shutil.which(tool) is None]
+    if missing:
+        print(f"Error: required tools not found on PATH: {', '.join(missing)}")
+        sys.exit(1)
 
 
 def main():
     print("Building and uploading PyVault Agent...")
 
+    # Check every tool up front so nothing fails half way through
+    check_tools(["uv"])
+
     # Check for PyPI token
     pypi_token = os.getenv("PYPI_TOKEN")
     if not pypi_token:
@@ -28,13 +43,18 @@ def main():
         sys.exit(1)
 
     # Clean previous builds
-    run_command("rm -rf dist/ *.egg-info/")
+    for path in ["dist", *glob.glob("*.egg-info")]:
+        print(f"Removing {path}")
+        shutil.rmtree(path, ignore_errors=True)
 
     # Build package
-    run_command("uv build")
+    run_command(["uv", "build"])
 
-    # Upload to PyPI
-    run_command(f"uv publish --token {pypi_token}")
+    # Upload to PyPI, passing the token through the environment so it is
+    # never echoed or visible in the process list
+    run_command(
+        ["uv", "publish"], env={**os.environ, "UV_PUBLISH_TOKEN": pypi_token}
+    )
 
     print("✅ Package uploaded successfully!")
 
@@ -48,7 +48,7 @@ def example_psycopg2_pool():
     manager = DatabaseConnectionManager(
         vault_client=client,
         role="sales-readonly",
-        pool_class=psycopg2.pool.SimpleConnectionPool,
+        pool_class=psycopg2.pool.ThreadedConnectionPool,
         pool_kwargs={
             "minconn": 1,
             "maxconn": 10,
@@ -157,7 +157,7 @@ def example_error_handling():
         manager = DatabaseConnectionManager(
             vault_client=client,
             role="sales-readonly",
-            pool_class=psycopg2.pool.SimpleConnectionPool,
+            pool_class=psycopg2.pool.ThreadedConnectionPool,
             pool_kwargs={
                 "minconn": 1,
                 "maxconn": 5,
@@ -9,6 +9,7 @@ Set environment variable to run these tests:
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 import hvac
 from vault_agent import VaultAgentClient
@@ -36,46 +37,49 @@ class TestVaultIntegration:
         """Setup Vault for testing."""
         client = hvac.Client(url=VAULT_URL, token=VAULT_TOKEN)
 
-        client.sys.enable_auth_method(
-            method_type="approle",
-            path="approle",
-        )
-
-        client.auth.approle.create_or_update_approle(
-            "test-role",
-            token_policies=["default"],
-            token_ttl="1h",
-        )
-
-        role_id = client.auth.approle.read_role_id("test-role")["data"]["role_id"]
-
-        secret_id_response = client.auth.approle.generate_secret_id("test-role")
-        secret_id = secret_id_response["data"]["secret_id"]
-
-        client.sys.enable_secrets_engine(
-            backend_type="kv",
-            path="secret",
-            options={"version": "2"},
-        )
-
-        # Pre-populate test secrets for read-only tests
-        client.secrets.kv.v2.create_or_update_secret(
-            path="test-secret",
-            secret={"username": "testuser", "password": "testpass123"},
-            mount_point="secret"
-        )
-
-        client.secrets.kv.v2.create_or_update_secret(
-            path="expiry-test",
-            secret={"key": "value1"},
-            mount_point="secret"
-        )
-
-        client.secrets.kv.v2.create_or_update_secret(
-            path="reauth-test",
-            secret={"key": "value"},
-            mount_point="secret"
-        )
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            # Mounting the auth method and the secrets engine are independent
+            list(executor.map(lambda setup: setup(), [
+                lambda: client.sys.enable_auth_method(
+                    method_type="approle",
+                    path="approle",
+                ),
+                lambda: client.sys.enable_secrets_engine(
+                    backend_type="kv",
+                    path="secret",
+                    options={"version": "2"},
+                ),
+            ]))
+
+            client.auth.approle.create_or_update_approle(
+                "test-role",
+                token_policies=["default"],
+                token_ttl="1h",
+            )
+
+            role_id_future = executor.submit(
+                client.auth.approle.read_role_id, "test-role"
+            )
+            secret_id_future = executor.submit(
+                client.auth.approle.generate_secret_id, "test-role"
+            )
+
+            # Pre-populate test secrets for read-only tests
+            list(executor.map(
+                lambda item: client.secrets.kv.v2.create_or_update_secret(
+                    path=item[0],
+                    secret=item[1],
+                    mount_point="secret",
+                ),
+                [
+                    ("test-secret", {"username": "testuser", "password": "testpass123"}),
+                    ("expiry-test", {"key": "value1"}),
+                    ("reauth-test", {"key": "value"}),
+                ],
+            ))
+
+            role_id = role_id_future.result()["data"]["role_id"]
+            secret_id = secret_id_future.result()["data"]["secret_id"]
 
         yield {
             "role_id": role_id,
@@ -132,6 +136,10 @@ class TestVaultIntegration:
             cache_ttl=1,
         )
 
+        # Drive cache expiry with a fake clock instead of sleeping
+        now = [1000.0]
+        client.cache._clock = lambda: now[0]
+
         # Read pre-populated secret
         first_read = client.kv.read("expiry-test")
         assert first_read["key"] == "value1"
@@ -143,8 +151,7 @@ class TestVaultIntegration:
         assert cached_read["key"] == "value1"
         assert client.get_cache_stats()["hits"] == 1
 
-        import time
-        time.sleep(2)
+        now[0] += 2
 
         # After cache expires, should fetch from Vault again
         second_read = client.kv.read("expiry-test")
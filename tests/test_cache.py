@@ -1,8 +1,26 @@
 """Tests for the memory cache module."""
 
-import time
+import sys
+import threading
+
 import pytest
 from vault_agent.cache import MemoryCache
+from vault_agent.utils.exceptions import CacheError
+
+
+class FakeClock:
+    """Manually advanced clock for deterministic TTL tests."""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def time(self) -> float:
+        """Return the current fake time."""
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward."""
+        self.now += seconds
 
 
 class TestMemoryCache:
@@ -20,12 +38,16 @@ class TestMemoryCache:
 
     def test_cache_expiration(self):
         """Test that cache entries expire."""
-        cache = MemoryCache(default_ttl=1)
+        clock = FakeClock()
+        cache = MemoryCache(default_ttl=1, clock=clock.time)
 
         cache.set("key1", "value1", ttl=1)
         assert cache.get("key1") == "value1"
 
-        time.sleep(1.5)
+        clock.advance(0.5)
+        assert cache.get("key1") == "value1"
+
+        clock.advance(1.0)
         assert cache.get("key1") is None
 
     def test_cache_miss(self):
@@ -86,4 +108,248 @@ class TestMemoryCache:
         cache.set("key4", "value4")
 
         assert cache.get_stats()["size"] == 3
-        assert cache.get("key4") == "value4"
\ No newline at end of file
+        assert cache.get("key4") == "value4"
+
+    def test_zero_max_size(self):
+        """Test a cache with max_size=0 keeps only the latest entry."""
+        cache = MemoryCache(default_ttl=60, max_size=0)
+
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+
+        assert cache.get("key1") is None
+        assert cache.get("key2") == "value2"
+        assert cache.get_stats()["size"] == 1
+
+    def test_lru_eviction_order(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = MemoryCache(default_ttl=60, max_size=3)
+
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.set("key3", "value3")
+
+        assert cache.get("key1") == "value1"
+
+        cache.set("key4", "value4")
+
+        assert cache.get("key2") is None
+        assert cache.get("key1") == "value1"
+        assert cache.get("key3") == "value3"
+        assert cache.get("key4") == "value4"
+
+    def test_purge_expired(self):
+        """Test purging expired entries."""
+        clock = FakeClock()
+        cache = MemoryCache(default_ttl=60, clock=clock.time)
+
+        cache.set("short", "value1", ttl=1)
+        cache.set("long", "value2", ttl=10)
+
+        clock.advance(5)
+
+        assert cache.purge_expired() == 1
+        assert cache.get_stats()["size"] == 1
+        assert cache.get("long") == "value2"
+
+    def test_mset_and_mget(self):
+        """Test batch set and get operations."""
+        clock = FakeClock()
+        cache = MemoryCache(default_ttl=60, clock=clock.time)
+
+        cache.mset({"key1": "value1", "key2": "value2"}, ttl=5)
+
+        assert cache.mget(["key1", "key2", "missing"]) == {
+            "key1": "value1",
+            "key2": "value2",
+        }
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+        clock.advance(10)
+        assert cache.mget(["key1", "key2"]) == {}
+        assert cache.get_stats()["size"] == 0
+
+    def test_mset_respects_max_size(self):
+        """Test batch set evicts least recently used entries."""
+        cache = MemoryCache(default_ttl=60, max_size=3)
+
+        cache.set("old", "value")
+        cache.mset({"key1": 1, "key2": 2, "key3": 3})
+
+        assert cache.get("old") is None
+        assert cache.get_stats()["size"] == 3
+
+    def test_get_stale(self):
+        """Test stale entries are served by get_stale but not by get."""
+        clock = FakeClock()
+        cache = MemoryCache(default_ttl=60, clock=clock.time)
+
+        cache.set("key1", "value1", ttl=5, stale_ttl=10)
+        assert cache.get_stale("key1") == ("value1", False)
+
+        clock.advance(6)
+        assert cache.get("key1") is None
+        assert cache.get_stale("key1") == ("value1", True)
+        assert cache.purge_expired() == 0
+
+        clock.advance(10)
+        assert cache.get_stale("key1") == (None, False)
+        assert cache.get_stats()["size"] == 0
+
+    def test_purge_expired_skips_overwritten_entries(self):
+        """Test purging honours the latest TTL of a key."""
+        clock = FakeClock()
+        cache = MemoryCache(default_ttl=60, clock=clock.time)
+
+        cache.set("key1", "old", ttl=1)
+        cache.set("key1", "new", ttl=10)
+        cache.set("key2", "value", ttl=1)
+        cache.delete("key2")
+
+        clock.advance(5)
+
+        assert cache.purge_expired() == 0
+        assert cache.get("key1") == "new"
+
+        clock.advance(10)
+        assert cache.purge_expired() == 1
+        assert cache.get_stats()["size"] == 0
+
+    def test_writes_reclaim_expired_entries(self):
+        """Test writes drop expired entries before evicting live ones."""
+        clock = FakeClock()
+        cache = MemoryCache(default_ttl=60, max_size=3, clock=clock.time)
+
+        cache.set("live", "value", ttl=60)
+        cache.set("short1", "value", ttl=1)
+        cache.set("short2", "value", ttl=1)
+        clock.advance(5)
+
+        cache.set("new", "value")
+
+        assert cache.get("live") == "value"
+        assert cache.get_stats()["size"] == 2
+
+    def test_expiry_heap_is_compacted(self):
+        """Test repeatedly overwriting keys does not grow the heap unbounded."""
+        cache = MemoryCache(default_ttl=60)
+
+        for i in range(1000):
+            cache.set("key", i)
+
+        shard = cache._shards[0]
+        assert len(shard.expiry_heap) <= 2 * len(shard.entries) + 65
+
+    def test_delete_prefix(self):
+        """Test deleting all keys that share a prefix."""
+        cache = MemoryCache(default_ttl=60)
+        cache.mset({"db:app": 1, "db:other": 2, "kv:app": 3})
+
+        assert cache.delete_prefix("db:") == 2
+        assert cache.get("db:app") is None
+        assert cache.get("kv:app") == 3
+
+    def test_delete_many_and_key_snapshot(self):
+        """Test batch delete and iterating over a snapshot of keys."""
+        cache = MemoryCache(default_ttl=60)
+        cache.mset({"key1": 1, "key2": 2, "key3": 3})
+
+        for key in cache.iter_keys_snapshot():
+            if key != "key3":
+                cache.delete(key)
+
+        assert list(cache.iter_keys_snapshot()) == ["key3"]
+        assert "key3" in cache
+        assert "key1" not in cache
+        assert cache.delete_many(["key3", "missing"]) == 1
+        assert cache.get_stats()["size"] == 0
+
+    def test_sharded_cache(self):
+        """Test a sharded cache behaves like a single cache for lookups."""
+        clock = FakeClock()
+        cache = MemoryCache(default_ttl=60, max_size=64, clock=clock.time, shards=4)
+
+        cache.mset({f"key{i}": i for i in range(20)})
+        cache.set("short", "value", ttl=1)
+
+        assert cache.get("key7") == 7
+        assert cache.mget(["key1", "key2", "missing"]) == {"key1": 1, "key2": 2}
+        assert sorted(cache.iter_keys_snapshot()) == sorted(
+            [f"key{i}" for i in range(20)] + ["short"]
+        )
+        assert cache.delete_many(["key1", "key2"]) == 2
+        assert cache.delete_prefix("key1") == 10
+
+        clock.advance(5)
+        assert cache.purge_expired() == 1
+        assert cache.get_stats()["size"] == 8
+
+    def test_sharded_cache_bounds_each_shard(self):
+        """Test each shard holds at most its share of max_size."""
+        cache = MemoryCache(default_ttl=60, max_size=10, shards=4)
+
+        for i in range(100):
+            cache.set(f"key{i}", i)
+
+        assert all(len(shard.entries) <= 3 for shard in cache._shards)
+        assert cache.get_stats()["size"] <= 10
+
+    def test_sharded_cache_never_exceeds_max_size(self):
+        """Test more shards than entries still respects max_size."""
+        cache = MemoryCache(default_ttl=60, max_size=10, shards=16)
+
+        for i in range(100):
+            cache.set(f"key{i}", i)
+
+        assert len(cache._shards) == 10
+        assert cache.get_stats()["size"] == 10
+
+    def test_invalid_shard_count(self):
+        """Test a cache needs at least one shard."""
+        with pytest.raises(CacheError):
+            MemoryCache(shards=0)
+
+    def test_concurrent_reads_do_not_break_writers(self):
+        """Test hits on other threads never reorder the cache mid-iteration."""
+        cache = MemoryCache(default_ttl=60, max_size=200)
+        for i in range(100):
+            cache.set(f"key{i}", i)
+
+        stop = threading.Event()
+        errors = []
+
+        def reader():
+            while not stop.is_set():
+                for i in range(100):
+                    cache.get(f"key{i}")
+                    cache.get_stale(f"key{i}")
+
+        def writer():
+            try:
+                for i in range(300):
+                    cache.set(f"key{i % 100}", i)
+                    cache.set(f"other{i}", i)
+                    cache.delete_prefix("other")
+                    cache.iter_keys_snapshot()
+                    cache.purge_expired()
+            except Exception as e:
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            readers = [threading.Thread(target=reader) for _ in range(2)]
+            for thread in readers:
+                thread.start()
+            writer()
+        finally:
+            stop.set()
+            for thread in readers:
+                thread.join()
+            sys.setswitchinterval(interval)
+
+        assert errors == []
+
@@ -0,0 +1,203 @@
+"""Tests for the Vault Agent client."""
+
+import unittest
+from unittest.mock import Mock, patch
+
+from hvac.exceptions import Forbidden
+
+from vault_agent import VaultAgentClient
+from vault_agent.client import AUTH_RECHECK_INTERVAL
+
+
+class TestVaultAgentClient(unittest.TestCase):
+    """Test cases for VaultAgentClient authentication handling."""
+
+    def setUp(self):
+        """Set up a mocked hvac client."""
+        patcher = patch("vault_agent.client.hvac.Client")
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # The first client carries the token, the second performs logins
+        self.mock_hvac = Mock()
+        self.mock_login = Mock()
+        self.mock_client_class.side_effect = [self.mock_hvac, self.mock_login]
+        self.mock_login.auth.approle.login.return_value = {
+            "auth": {"client_token": "token-1", "lease_duration": 3600},
+        }
+        self.mock_hvac.auth.token.lookup_self.return_value = {
+            "data": {"ttl": 3600, "expire_time": "2030-01-01T00:00:00Z"},
+        }
+
+    def _make_client(self):
+        return VaultAgentClient(
+            url="http://vault:8200",
+            role_id="role-id",
+            secret_id="secret-id",
+        )
+
+    def test_authenticated_state_is_cached(self):
+        """Test the token is not looked up while it is known to be valid."""
+        client = self._make_client()
+
+        self.assertTrue(client._is_authenticated())
+        self.assertTrue(client._is_authenticated())
+
+        self.mock_hvac.auth.token.lookup_self.assert_not_called()
+        self.mock_hvac.sys.read_health_status.assert_not_called()
+
+    def test_token_rechecked_after_validity_window(self):
+        """Test the token is looked up again once the window has passed."""
+        client = self._make_client()
+        client._auth_valid_until = 0.0
+
+        self.assertTrue(client._is_authenticated())
+        self.mock_hvac.auth.token.lookup_self.assert_called_once()
+
+    def test_reauthenticates_when_lookup_fails(self):
+        """Test a failed token lookup triggers a new AppRole login."""
+        client = self._make_client()
+        client._auth_valid_until = 0.0
+        self.mock_hvac.auth.token.lookup_self.side_effect = Exception("permission denied")
+
+        client._get_client()
+
+        self.assertEqual(self.mock_login.auth.approle.login.call_count, 2)
+
+    def test_token_near_expiry_is_replaced(self):
+        """Test a token with less than the minimum TTL left triggers a login."""
+        client = self._make_client()
+        client._auth_valid_until = 0.0
+        self.mock_hvac.auth.token.lookup_self.return_value = {
+            "data": {"ttl": 10, "expire_time": "2030-01-01T00:00:00Z"},
+        }
+
+        client._get_client()
+
+        self.assertEqual(self.mock_login.auth.approle.login.call_count, 2)
+
+    def test_expired_token_with_zero_ttl_is_not_trusted(self):
+        """Test a TTL of 0 on an expiring token is not read as non-expiring."""
+        client = self._make_client()
+        client._auth_valid_until = 0.0
+        self.mock_hvac.auth.token.lookup_self.return_value = {
+            "data": {"ttl": 0, "expire_time": "2030-01-01T00:00:00Z"},
+        }
+
+        self.assertFalse(client._is_authenticated())
+
+    def test_non_expiring_token_rechecked_on_interval(self):
+        """Test a token without expire_time is re-checked periodically."""
+        client = self._make_client()
+        client._auth_valid_until = 0.0
+        self.mock_hvac.auth.token.lookup_self.return_value = {
+            "data": {"ttl": 0, "expire_time": None},
+        }
+
+        with patch("vault_agent.client.time.monotonic", return_value=1000.0):
+            self.assertTrue(client._is_authenticated())
+
+        self.assertEqual(client._auth_valid_until, 1000.0 + AUTH_RECHECK_INTERVAL)
+
+    def test_forbidden_response_reauthenticates_and_retries(self):
+        """Test a revoked token is replaced when Vault answers 403."""
+        client = self._make_client()
+        self.mock_hvac.token = "revoked-token"
+        self.mock_hvac.sys.read_mount_configuration.return_value = {
+            "options": {"version": "1"},
+        }
+        read = self.mock_hvac.secrets.kv.v1.read_secret
+        read.side_effect = [Forbidden("permission denied"), {"data": {"key": "value"}}]
+
+        self.assertEqual(client.kv.read("app"), {"key": "value"})
+
+        self.assertEqual(self.mock_login.auth.approle.login.call_count, 2)
+        self.assertEqual(self.mock_hvac.token, "token-1")
+        self.assertEqual(read.call_count, 2)
+
+    def test_forbidden_with_replaced_token_skips_login(self):
+        """Test a 403 for a token that was already replaced does not log in."""
+        client = self._make_client()
+
+        client._reauthenticate_after_forbidden("older-token")
+
+        self.mock_login.auth.approle.login.assert_called_once()
+
+    def test_reauthentication_reuses_client(self):
+        """Test re-authentication keeps the same hvac client and session."""
+        client = self._make_client()
+        hvac_client = client._client
+
+        client._authenticate()
+
+        self.assertIs(client._client, hvac_client)
+        self.assertEqual(self.mock_client_class.call_count, 2)
+        for call in self.mock_client_class.call_args_list:
+            self.assertIs(call.kwargs["session"], client._session)
+        self.assertEqual(self.mock_login.auth.approle.login.call_count, 2)
+
+    def test_token_kept_until_login_succeeds(self):
+        """Test re-login never leaves the shared client without a token."""
+        client = self._make_client()
+        tokens_during_login = []
+
+        def login(**kwargs):
+            tokens_during_login.append(self.mock_hvac.token)
+            return {"auth": {"client_token": "token-2", "lease_duration": 3600}}
+
+        self.mock_login.auth.approle.login.side_effect = login
+
+        client._authenticate()
+
+        self.assertEqual(tokens_during_login, ["token-1"])
+        self.assertEqual(self.mock_hvac.token, "token-2")
+        self.mock_login.auth.approle.login.assert_called_with(
+            role_id="role-id", secret_id="secret-id", use_token=False
+        )
+
+    def test_proxied_attribute_reauthenticates_expired_token(self):
+        """Test proxied attribute access renews an expired token every time."""
+        client = self._make_client()
+        client.secrets
+
+        client._auth_valid_until = 0.0
+        self.mock_hvac.auth.token.lookup_self.side_effect = Exception("token expired")
+
+        client.secrets
+        self.assertEqual(self.mock_login.auth.approle.login.call_count, 2)
+
+        client._auth_valid_until = 0.0
+        client.secrets
+        self.assertEqual(self.mock_login.auth.approle.login.call_count, 3)
+        self.assertEqual(self.mock_hvac.auth.token.lookup_self.call_count, 2)
+        self.assertNotIn("secrets", client.__dict__)
+
+
+class TestVaultAgentClientTLS(unittest.TestCase):
+    """Test TLS verification settings reach the hvac adapter."""
+
+    def _adapter_verify(self, verify):
+        with patch("hvac.api.auth_methods.AppRole.login") as login:
+            login.return_value = {
+                "auth": {"client_token": "token-1", "lease_duration": 3600},
+            }
+            client = VaultAgentClient(
+                url="https://vault:8200",
+                role_id="role-id",
+                secret_id="secret-id",
+                verify=verify,
+            )
+        return client._client.adapter._kwargs["verify"]
+
+    def test_verify_disabled(self):
+        """Test verify=False is not overridden by the shared session."""
+        self.assertIs(self._adapter_verify(False), False)
+
+    def test_verify_ca_bundle(self):
+        """Test a CA bundle path reaches the adapter."""
+        ca_bundle = "/etc/ssl/vault-ca.pem"
+        self.assertEqual(self._adapter_verify(ca_bundle), ca_bundle)
+
+
+if __name__ == "__main__":
+    unittest.main()
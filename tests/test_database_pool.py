@@ -2,6 +2,7 @@
 
 import time
 import unittest
+from threading import Thread
 from unittest.mock import Mock, MagicMock, patch, call
 from vault_agent.database_pool import DatabaseConnectionManager, BackgroundRefreshManager
 
@@ -31,6 +32,37 @@ class MockPool:
         self.closed = True
 
 
+class MockPsycopgPool:
+    """Mock pool mirroring psycopg2's AbstractConnectionPool internals."""
+
+    def __init__(self, minconn=1, maxconn=5, **kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.closed = False
+        self._kwargs = kwargs
+        self._pool = []
+
+    def _connect(self):
+        conn = Mock()
+        conn.user = self._kwargs["user"]
+        return conn
+
+    def getconn(self):
+        """Get an idle connection or open a new one."""
+        return self._pool.pop() if self._pool else self._connect()
+
+    def putconn(self, conn, close=False):
+        """Return a connection, closing it if requested."""
+        if close:
+            conn.close()
+        else:
+            self._pool.append(conn)
+
+    def closeall(self):
+        """Close all connections."""
+        self.closed = True
+
+
 class TestDatabaseConnectionManager(unittest.TestCase):
     """Test cases for DatabaseConnectionManager."""
 
@@ -58,8 +90,8 @@ class TestDatabaseConnectionManager(unittest.TestCase):
         self.assertEqual(manager.role, "test-role")
         self.assertIsNotNone(manager.pool)
         self.assertIsNotNone(manager.credentials)
-        self.assertEqual(manager.credentials["user"], "test_user")
-        self.assertEqual(manager.credentials["password"], "test_pass")
+        self.assertEqual(manager.credentials.user, "test_user")
+        self.assertEqual(manager.credentials.password, "test_pass")
 
     def test_get_connection(self):
         """Test getting a connection from the pool."""
@@ -84,10 +116,12 @@ class TestDatabaseConnectionManager(unittest.TestCase):
 
         initial_expire_time = manager.credentials_expire_at
 
-        time.sleep(0.001)
-
-        with manager.get_connection() as conn:
-            pass
+        with patch(
+            "vault_agent.database_pool._monotonic",
+            return_value=manager.credentials_hard_expire_at + 1,
+        ):
+            with manager.get_connection() as conn:
+                pass
 
         self.assertGreater(manager.credentials_expire_at, initial_expire_time)
         self.assertEqual(
@@ -95,6 +129,80 @@ class TestDatabaseConnectionManager(unittest.TestCase):
             2,
         )
 
+    def test_near_expiry_refreshes_in_background(self):
+        """Test credentials near expiry are refreshed without blocking."""
+        manager = DatabaseConnectionManager(
+            vault_client=self.mock_vault_client,
+            role="test-role",
+            pool_class=MockPool,
+        )
+
+        initial_pool = manager.pool
+
+        with patch(
+            "vault_agent.database_pool._monotonic",
+            return_value=manager.credentials_expire_at + 1,
+        ):
+            with manager.get_connection() as conn:
+                self.assertIsNotNone(conn)
+
+            manager._async_refresh_thread.join(timeout=2)
+
+        self.assertIsNot(manager.pool, initial_pool)
+        self.assertEqual(
+            self.mock_vault_client.database.client.secrets.database.generate_credentials.call_count,
+            2,
+        )
+
+    def test_concurrent_expiry_triggers_single_refresh(self):
+        """Test concurrent callers share one credential refresh."""
+        manager = DatabaseConnectionManager(
+            vault_client=self.mock_vault_client,
+            role="test-role",
+            pool_class=MockPool,
+        )
+        manager.credentials_expire_at = 0.0
+
+        def borrow():
+            with manager.get_connection():
+                pass
+
+        threads = [Thread(target=borrow) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(
+            self.mock_vault_client.database.client.secrets.database.generate_credentials.call_count,
+            2,
+        )
+
+    def test_recently_used_connection_skips_validation(self):
+        """Test connections returned recently are not validated again."""
+        manager = DatabaseConnectionManager(
+            vault_client=self.mock_vault_client,
+            role="test-role",
+            pool_class=MockPsycopgPool,
+            validation_interval=30,
+        )
+
+        with manager.get_connection() as conn:
+            pass
+        self.assertEqual(conn.cursor.return_value.execute.call_count, 1)
+
+        with manager.get_connection() as reused:
+            self.assertIs(reused, conn)
+        self.assertEqual(conn.cursor.return_value.execute.call_count, 1)
+
+        with patch(
+            "vault_agent.database_pool._monotonic",
+            return_value=manager._last_used[conn] + 31,
+        ):
+            with manager.get_connection() as reused:
+                self.assertIs(reused, conn)
+        self.assertEqual(conn.cursor.return_value.execute.call_count, 2)
+
     def test_connection_validation(self):
         """Test connection validation logic."""
         manager = DatabaseConnectionManager(
@@ -112,9 +220,29 @@ class TestDatabaseConnectionManager(unittest.TestCase):
         self.assertTrue(result)
         mock_cursor.execute.assert_called_with("SELECT 1")
 
+        self.assertTrue(manager._validate_connection(mock_conn))
+        mock_conn.cursor.assert_called_once()
+
         mock_cursor.execute.side_effect = Exception("Connection error")
         result = manager._validate_connection(mock_conn)
         self.assertFalse(result)
+        mock_cursor.close.assert_called_once()
+        self.assertNotIn(mock_conn, manager._validation_cursors)
+
+    def test_close_drops_validation_cursors(self):
+        """Test closing the manager forgets cursors of its connections."""
+        manager = DatabaseConnectionManager(
+            vault_client=self.mock_vault_client,
+            role="test-role",
+            pool_class=MockPool,
+        )
+        mock_conn = Mock()
+        manager._validate_connection(mock_conn)
+        self.assertIn(mock_conn, manager._validation_cursors)
+
+        manager.close()
+
+        self.assertEqual(len(manager._validation_cursors), 0)
 
     def test_refresh_callback(self):
         """Test refresh callback is called."""
@@ -160,6 +288,75 @@ class TestDatabaseConnectionManager(unittest.TestCase):
 
         self.assertTrue(old_pool.closed)
 
+    def test_psycopg_pool_rebound_on_refresh(self):
+        """Test psycopg2-style pools are rebound instead of recreated."""
+        manager = DatabaseConnectionManager(
+            vault_client=self.mock_vault_client,
+            role="test-role",
+            pool_class=MockPsycopgPool,
+        )
+        pool = manager.pool
+
+        with manager.get_connection() as idle_conn:
+            pass
+
+        self.mock_vault_client.database.client.secrets.database.generate_credentials.return_value = {
+            "data": {"username": "new_user", "password": "new_pass"},
+            "lease_duration": 3600,
+        }
+
+        with manager.get_connection() as in_use_conn:
+            manager.refresh_now()
+
+        self.assertIs(manager.pool, pool)
+        self.assertFalse(pool.closed)
+        self.assertEqual(pool._kwargs["user"], "new_user")
+        self.assertIs(in_use_conn, idle_conn)
+        in_use_conn.close.assert_called_once()
+        self.assertEqual(pool._pool, [])
+
+        with manager.get_connection() as conn:
+            self.assertEqual(conn.user, "new_user")
+
+    def test_unlocked_psycopg_pool_checkout_serialized_with_rebind(self):
+        """Test pools without their own lock are checked out under the manager lock."""
+        manager = DatabaseConnectionManager(
+            vault_client=self.mock_vault_client,
+            role="test-role",
+            pool_class=MockPsycopgPool,
+        )
+        pool = manager.pool
+        lock_held = []
+        original_getconn = pool.getconn
+
+        def getconn():
+            lock_held.append(manager._lock.locked())
+            return original_getconn()
+
+        pool.getconn = getconn
+        manager._pool_handle = (pool, *manager._resolve_pool_methods(pool))
+
+        with manager.get_connection():
+            pass
+
+        self.assertEqual(lock_held, [True])
+        self.assertFalse(manager._lock.locked())
+
+    def test_locked_psycopg_pool_checkout_not_wrapped(self):
+        """Test pools with their own lock are called directly."""
+        manager = DatabaseConnectionManager(
+            vault_client=self.mock_vault_client,
+            role="test-role",
+            pool_class=MockPsycopgPool,
+        )
+        pool = manager.pool
+        pool._lock = MagicMock()
+
+        get_conn, put_conn = manager._resolve_pool_methods(pool)
+
+        self.assertEqual(get_conn, pool.getconn)
+        self.assertEqual(put_conn, pool.putconn)
+
     def test_context_manager(self):
         """Test using manager as context manager."""
         with DatabaseConnectionManager(
@@ -179,7 +376,7 @@ class TestDatabaseConnectionManager(unittest.TestCase):
             pool_class=MockPool,
         )
 
-        with patch.object(manager, "_validate_connection") as mock_validate:
+        with patch.object(DatabaseConnectionManager, "_validate_connection") as mock_validate:
             mock_validate.side_effect = [False, True]
 
             with manager.get_connection(retry=True) as conn:
@@ -220,19 +417,18 @@ class TestBackgroundRefreshManager(unittest.TestCase):
 
         manager.close()
 
-    @patch("time.sleep")
-    def test_background_refresh_loop(self, mock_sleep):
+    def test_background_refresh_loop(self):
         """Test background refresh loop logic."""
         manager = BackgroundRefreshManager(
             vault_client=self.mock_vault_client,
             role="test-role",
             pool_class=MockPool,
             check_interval=1,
-            refresh_buffer=0.0001,
         )
 
-        time.sleep(0.001)
-        manager._background_refresh_loop()
+        manager.credentials_expire_at = 0.0
+        with patch.object(manager._stop_event, "wait", return_value=True):
+            manager._background_refresh_loop()
 
         self.assertGreater(
             self.mock_vault_client.database.client.secrets.database.generate_credentials.call_count,
@@ -241,21 +437,60 @@ class TestBackgroundRefreshManager(unittest.TestCase):
 
         manager.close()
 
+    def test_background_refresh_sleeps_until_expiry(self):
+        """Test the refresh thread waits until the credentials are due."""
+        manager = BackgroundRefreshManager(
+            vault_client=self.mock_vault_client,
+            role="test-role",
+            pool_class=MockPool,
+            check_interval=1,
+        )
+
+        with patch.object(manager._stop_event, "wait", return_value=True) as mock_wait:
+            manager._background_refresh_loop()
+
+        delay = mock_wait.call_args[0][0]
+        self.assertGreater(delay, 3600 * 0.8 - 5)
+        self.assertLessEqual(delay, 3600 * 0.8)
+
+        manager.close()
+
+    def test_background_refresh_retries_after_failure(self):
+        """Test a failed refresh is retried after check_interval."""
+        manager = BackgroundRefreshManager(
+            vault_client=self.mock_vault_client,
+            role="test-role",
+            pool_class=MockPool,
+            check_interval=7,
+        )
+
+        manager.credentials_expire_at = 0.0
+        self.mock_vault_client.database.client.secrets.database.generate_credentials.side_effect = Exception("vault down")
+
+        with patch.object(manager._stop_event, "wait", return_value=True) as mock_wait:
+            manager._background_refresh_loop()
+
+        mock_wait.assert_called_once_with(7)
+
+        manager.close()
+
     def test_background_thread_stops_on_close(self):
         """Test background thread stops when manager closes."""
         manager = BackgroundRefreshManager(
             vault_client=self.mock_vault_client,
             role="test-role",
             pool_class=MockPool,
-            check_interval=1,
+            check_interval=60,
         )
 
         thread = manager._refresh_thread
         self.assertTrue(thread.is_alive())
 
+        started = time.monotonic()
         manager.close()
         thread.join(timeout=2)
         self.assertFalse(thread.is_alive())
+        self.assertLess(time.monotonic() - started, 1)
 
 
 if __name__ == "__main__":
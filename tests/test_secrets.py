@@ -0,0 +1,349 @@
+"""Tests for the KV and database secrets engines."""
+
+import pickle
+import threading
+import unittest
+from unittest.mock import Mock
+
+from hvac.exceptions import Forbidden, InvalidPath, InvalidRequest
+
+from vault_agent.cache import MemoryCache
+from vault_agent.secrets import DatabaseSecrets, KVSecrets
+from vault_agent.utils.exceptions import SecretNotFoundError
+
+
+class TestDatabaseSecrets(unittest.TestCase):
+    """Test cases for DatabaseSecrets."""
+
+    def setUp(self):
+        """Set up a mocked Vault client."""
+        self.client = Mock()
+        self.client.secrets.database.generate_credentials.return_value = {
+            "data": {"username": "dyn_user", "password": "dyn_pass"},
+            "lease_duration": 3600,
+        }
+        self.client.secrets.database.get_static_credentials.return_value = {
+            "data": {"username": "static_user", "password": "static_pass"},
+        }
+        self.cache = MemoryCache()
+        self.database = DatabaseSecrets(self.client, self.cache, "database")
+
+    def test_clear_cache_only_removes_own_mount(self):
+        """Test clearing all credentials leaves other mounts cached."""
+        self.database.get_credentials("app")
+        self.database.get_static_credentials("app")
+        other = DatabaseSecrets(self.client, self.cache, "database2")
+        other.get_credentials("app")
+
+        self.database.clear_cache()
+
+        self.assertIsNone(self.cache.get("db:database:app"))
+        self.assertIsNone(self.cache.get("db:static:database:app"))
+        self.assertIsNotNone(self.cache.get("db:database2:app"))
+
+    def test_clear_cache_for_role(self):
+        """Test clearing a single role's credentials."""
+        self.database.get_credentials("app")
+        self.database.get_credentials("other")
+
+        self.database.clear_cache("app")
+
+        self.assertIsNone(self.cache.get("db:database:app"))
+        self.assertIsNotNone(self.cache.get("db:database:other"))
+
+    def test_stale_credentials_served_while_refreshing(self):
+        """Test credentials past their cache TTL but within the lease are
+        returned immediately and refreshed in the background."""
+        clock = [1000.0]
+        self.cache = MemoryCache(clock=lambda: clock[0])
+        self.database = DatabaseSecrets(self.client, self.cache, "database")
+        generate = self.client.secrets.database.generate_credentials
+
+        first = self.database.get_credentials("app", ttl=60)
+
+        refreshed = threading.Event()
+        generate.side_effect = lambda **kwargs: (
+            refreshed.set(),
+            {
+                "data": {"username": "new_user", "password": "new_pass"},
+                "lease_duration": 3600,
+            },
+        )[1]
+        clock[0] += 120
+
+        self.assertEqual(self.database.get_credentials("app", ttl=60), first)
+        self.assertTrue(refreshed.wait(timeout=2))
+        self.database._inflight._executor.shutdown(wait=True)
+        self.assertEqual(
+            self.database.get_credentials("app", ttl=60)["username"], "new_user"
+        )
+
+    def test_stale_credentials_lease_is_renewed(self):
+        """Test the background refresh renews the lease instead of
+        generating new credentials."""
+        clock = [1000.0]
+        self.cache = MemoryCache(clock=lambda: clock[0])
+        self.database = DatabaseSecrets(self.client, self.cache, "database")
+        generate = self.client.secrets.database.generate_credentials
+        generate.return_value = dict(generate.return_value, lease_id="lease-1")
+        # Like Vault, the renewed TTL is the increment if given, measured
+        # from now, otherwise the role's default TTL
+        self.client.sys.renew_lease.side_effect = (
+            lambda lease_id, increment=None: {"lease_duration": increment or 3600}
+        )
+
+        first = self.database.get_credentials("app", ttl=60)
+        clock[0] += 120
+        self.database.get_credentials("app", ttl=60)
+        self.database._inflight._executor.shutdown(wait=True)
+
+        self.client.sys.renew_lease.assert_called_once_with(lease_id="lease-1")
+        generate.assert_called_once()
+        self.assertIs(self.cache.get("db:database:app"), first)
+
+        # The renewed lease keeps the credentials usable for most of an hour
+        clock[0] += 3000
+        self.assertEqual(self.cache.get_stale("db:database:app"), (first, True))
+
+    def test_failed_renewal_generates_new_credentials(self):
+        """Test new credentials are generated when the lease cannot be renewed."""
+        clock = [1000.0]
+        self.cache = MemoryCache(clock=lambda: clock[0])
+        self.database = DatabaseSecrets(self.client, self.cache, "database")
+        generate = self.client.secrets.database.generate_credentials
+        generate.return_value = dict(generate.return_value, lease_id="lease-1")
+        self.client.sys.renew_lease.side_effect = Exception("lease not renewable")
+
+        self.database.get_credentials("app", ttl=60)
+        clock[0] += 120
+        self.database.get_credentials("app", ttl=60)
+        self.database._inflight._executor.shutdown(wait=True)
+
+        self.assertEqual(generate.call_count, 2)
+
+    def test_credentials_past_lease_block_on_vault(self):
+        """Test credentials past their lease are fetched synchronously."""
+        clock = [1000.0]
+        self.cache = MemoryCache(clock=lambda: clock[0])
+        self.database = DatabaseSecrets(self.client, self.cache, "database")
+
+        self.database.get_credentials("app", ttl=60)
+        clock[0] += 3600
+
+        self.database.get_credentials("app", ttl=60)
+
+        self.assertEqual(
+            self.client.secrets.database.generate_credentials.call_count, 2
+        )
+        self.assertIsNone(self.database._inflight._executor)
+
+    def test_missing_role_is_negatively_cached(self):
+        """Test a missing role is not looked up again within negative_ttl."""
+        generate = self.client.secrets.database.generate_credentials
+        generate.side_effect = InvalidRequest("unknown role")
+
+        for _ in range(3):
+            with self.assertRaises(SecretNotFoundError) as ctx:
+                self.database.get_credentials("missing")
+        self.assertEqual(str(ctx.exception), "Database role not found: missing")
+        self.assertEqual(ctx.exception.name, "missing")
+
+        generate.assert_called_once()
+
+        self.database.clear_cache("missing")
+        with self.assertRaises(SecretNotFoundError):
+            self.database.get_credentials("missing")
+        self.assertEqual(generate.call_count, 2)
+
+    def test_forbidden_retried_once_after_reauthentication(self):
+        """Test a 403 calls the reauthenticate callback and retries once."""
+        reauthenticate = Mock()
+        self.client.token = "old-token"
+        database = DatabaseSecrets(
+            self.client, self.cache, "database", reauthenticate=reauthenticate
+        )
+        generate = self.client.secrets.database.generate_credentials
+        generate.side_effect = [Forbidden("permission denied")] * 2
+
+        with self.assertRaises(Forbidden):
+            database.get_credentials("app")
+
+        reauthenticate.assert_called_once_with("old-token")
+        self.assertEqual(generate.call_count, 2)
+
+    def test_other_vault_errors_are_not_translated(self):
+        """Test errors other than a missing role propagate unchanged."""
+        self.client.secrets.database.get_static_credentials.side_effect = (
+            Forbidden("permission denied")
+        )
+
+        with self.assertRaises(Forbidden):
+            self.database.get_static_credentials("app")
+
+    def test_get_connection_string(self):
+        """Test the template is filled with credentials and extra fields."""
+        self.assertEqual(
+            self.database.get_connection_string(
+                "app",
+                template="postgresql://{username}:{password}@{host}:{port}/{database}",
+                host="db",
+                port=5432,
+            ),
+            "postgresql://dyn_user:dyn_pass@db:5432/postgres",
+        )
+
+    def test_mget_credentials(self):
+        """Test batch lookup serves hits from cache and fetches misses."""
+        self.database.get_credentials("cached")
+        generate = self.client.secrets.database.generate_credentials
+        generate.reset_mock()
+
+        creds = self.database.mget_credentials(["cached", "a", "b", "a"])
+
+        self.assertEqual(set(creds), {"cached", "a", "b"})
+        self.assertEqual(creds["a"]["username"], "dyn_user")
+        self.assertEqual(
+            sorted(call.kwargs["name"] for call in generate.call_args_list),
+            ["a", "b"],
+        )
+
+
+class TestKVSecrets(unittest.TestCase):
+    """Test cases for KVSecrets."""
+
+    def setUp(self):
+        """Set up a mocked Vault client with a KV v2 mount."""
+        self.client = Mock()
+        self.client.sys.read_mount_configuration.return_value = {
+            "options": {"version": "2"},
+        }
+        self.client.secrets.kv.v2.read_secret_version.return_value = {
+            "data": {"data": {"key": "value"}},
+        }
+        self.cache = MemoryCache()
+        self.kv = KVSecrets(self.client, self.cache, "secret")
+
+    def test_read_is_cached(self):
+        """Test a second read is served from the cache."""
+        self.assertEqual(self.kv.read("app"), {"key": "value"})
+        self.assertEqual(self.kv.read("app"), {"key": "value"})
+
+        self.client.secrets.kv.v2.read_secret_version.assert_called_once()
+
+    def test_key_index_is_pruned_after_eviction(self):
+        """Test keys evicted from the cache do not accumulate in the index."""
+        self.kv = KVSecrets(self.client, MemoryCache(max_size=10), "secret")
+
+        for i in range(2000):
+            self.kv.read(f"path{i}")
+
+        self.assertLessEqual(len(self.kv._cache_keys), 256 + 1)
+
+        self.kv.clear_cache()
+        self.assertEqual(len(self.kv._cache_keys), 0)
+
+    def test_mread(self):
+        """Test batch read serves hits from cache and reads misses."""
+        self.kv.read("cached")
+        read = self.client.secrets.kv.v2.read_secret_version
+        read.reset_mock()
+
+        secrets = self.kv.mread(["cached", "a", "b"])
+
+        self.assertEqual(
+            secrets,
+            {"cached": {"key": "value"}, "a": {"key": "value"}, "b": {"key": "value"}},
+        )
+        self.assertEqual(read.call_count, 2)
+
+    def test_mount_version_read_once(self):
+        """Test the mount configuration is only read on first use."""
+        self.kv.read("app")
+        self.kv.read("other")
+        self.kv.list_secrets()
+
+        self.client.sys.read_mount_configuration.assert_called_once()
+
+        self.kv.refresh_mount_info()
+        self.kv.read("third")
+        self.assertEqual(self.client.sys.read_mount_configuration.call_count, 2)
+
+    def test_failed_mount_lookup_is_retried(self):
+        """Test a failed mount lookup is not remembered."""
+        self.client.sys.read_mount_configuration.side_effect = [
+            Exception("connection reset"),
+            {"options": {"version": "2"}},
+        ]
+
+        self.assertFalse(self.kv._is_kv_v2())
+        self.assertTrue(self.kv._is_kv_v2())
+
+    def test_list_secrets_without_keys(self):
+        """Test a listing response without keys yields an empty list."""
+        self.client.secrets.kv.v2.list_secrets.return_value = {"data": {}}
+
+        self.assertEqual(self.kv.list_secrets("empty"), [])
+
+    def test_missing_secret_is_negatively_cached(self):
+        """Test a missing secret is not read again until negative_ttl passes."""
+        clock = [1000.0]
+        self.kv = KVSecrets(
+            self.client, MemoryCache(clock=lambda: clock[0]), "secret",
+            negative_ttl=5,
+        )
+        read = self.client.secrets.kv.v2.read_secret_version
+        read.side_effect = InvalidPath()
+
+        for _ in range(2):
+            with self.assertRaises(SecretNotFoundError):
+                self.kv.read("missing")
+        read.assert_called_once()
+
+        clock[0] += 6
+        with self.assertRaises(SecretNotFoundError):
+            self.kv.read("missing")
+        self.assertEqual(read.call_count, 2)
+
+    def test_clear_cache_for_path(self):
+        """Test clearing one path removes all of its cached versions."""
+        self.kv.read("app")
+        self.kv.read("app", version=2)
+        self.kv.read("other")
+
+        self.kv.clear_cache("app")
+
+        self.assertIsNone(self.cache.get("kv:secret:app"))
+        self.assertIsNone(self.cache.get("kv:secret:app:v2"))
+        self.assertIsNotNone(self.cache.get("kv:secret:other"))
+
+        self.kv.clear_cache()
+        self.assertIsNone(self.cache.get("kv:secret:other"))
+
+
+class TestSecretNotFoundError(unittest.TestCase):
+    """Test cases for SecretNotFoundError."""
+
+    def test_message_built_from_kind_and_name(self):
+        """Test the message is formatted from its parts."""
+        error = SecretNotFoundError("Secret", "app/config")
+
+        self.assertEqual(str(error), "Secret not found: app/config")
+        self.assertEqual(error.kind, "Secret")
+        self.assertEqual(error.name, "app/config")
+
+    def test_plain_message(self):
+        """Test a single message argument is used as-is."""
+        error = SecretNotFoundError("Nothing here")
+
+        self.assertEqual(str(error), "Nothing here")
+        self.assertIsNone(error.name)
+
+    def test_pickle_round_trip(self):
+        """Test the error survives pickling with its fields intact."""
+        error = pickle.loads(pickle.dumps(SecretNotFoundError("Secret", "app")))
+
+        self.assertEqual(str(error), "Secret not found: app")
+
+
+if __name__ == "__main__":
+    unittest.main()
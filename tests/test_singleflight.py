@@ -0,0 +1,94 @@
+"""Tests for request coalescing."""
+
+import threading
+import time
+import unittest
+
+from vault_agent.utils import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for SingleFlight."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test callers for the same key wait for the first call."""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=2)
+            return "value"
+
+        def worker():
+            results.append(flight.do("key", fetch))
+
+        leader = threading.Thread(target=worker)
+        leader.start()
+        started.wait(timeout=2)
+
+        followers = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+
+        # Give the followers time to reach the in-flight call
+        time.sleep(0.2)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(timeout=2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+
+    def test_errors_propagate_and_key_is_released(self):
+        """Test a failed call raises and does not block later calls."""
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flight.do("key", fail)
+
+        self.assertEqual(flight.do("key", lambda: "ok"), "ok")
+
+    def test_submit_runs_in_background_once(self):
+        """Test submit skips keys that already have a call in flight."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(timeout=2)
+            return "value"
+
+        self.assertTrue(flight.submit("key", fetch))
+        self.assertFalse(flight.submit("key", fetch))
+
+        release.set()
+        # A do() for the same key joins the background call if still running
+        self.assertEqual(flight.do("key", lambda: "value"), "value")
+        flight._executor.shutdown(wait=True)
+        self.assertEqual(len(calls), 1)
+
+    def test_submit_logs_errors_and_releases_key(self):
+        """Test a failed background call does not block later calls."""
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertLogs("vault_agent.utils.singleflight", level="WARNING"):
+            self.assertTrue(flight.submit("key", fail))
+            flight._executor.shutdown(wait=True)
+
+        self.assertEqual(flight.do("key", lambda: "ok"), "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,43 +14,158 @@
 
 """In-memory cache with TTL support."""
 
+import heapq
 import time
-from typing import Any, Optional, Dict, Tuple
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Dict, Tuple
 from threading import Lock
 
 from ..utils.exceptions import CacheError
 
+# Heap records examined per write when dropping expired entries
+_WRITE_PURGE_LIMIT = 4
 
-class CacheEntry:
-    """Represents a single cache entry with expiration."""
 
-    def __init__(self, value: Any, ttl: int):
-        self.value = value
-        self.expires_at = time.time() + ttl
+class _Shard:
+    """One independently locked partition of a MemoryCache."""
 
-    def is_expired(self) -> bool:
-        """Check if the cache entry has expired."""
-        return time.time() >= self.expires_at
+    __slots__ = ("entries", "expiry_heap", "lock", "max_size")
+
+    def __init__(self, max_size: int):
+        self.entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self.expiry_heap: List[Tuple[float, str]] = []
+        self.lock = Lock()
+        self.max_size = max_size
+
+    def touch(self, key: str) -> None:
+        """
+        Mark key as most recently used, unless the lock is busy.
+
+        Reordering mutates the OrderedDict, so it must hold the lock; hits
+        skip it rather than wait, which only makes eviction order
+        approximate while the shard is contended.
+        """
+        if self.lock.acquire(blocking=False):
+            try:
+                self.entries.move_to_end(key)
+            except KeyError:
+                pass
+            finally:
+                self.lock.release()
+
+    def purge(self, now: float, limit: Optional[int] = None) -> int:
+        """
+        Drop entries whose stale window has ended, oldest first.
+
+        Must be called with the lock held.
+
+        Args:
+            now: The current clock time.
+            limit: Maximum number of heap records to examine, or None for all
+                that have expired.
+
+        Returns:
+            The number of entries removed.
+        """
+        heap = self.expiry_heap
+        removed = 0
+        while heap and heap[0][0] <= now and limit != 0:
+            stale_until, key = heapq.heappop(heap)
+            entry = self.entries.get(key)
+            # Skip records left behind by overwritten or deleted keys
+            if entry is not None and entry[2] == stale_until:
+                del self.entries[key]
+                removed += 1
+            if limit is not None:
+                limit -= 1
+        return removed
+
+    def push_expiry(self, stale_until: float, key: str) -> None:
+        """Record when key can be purged. Must be called with the lock held."""
+        heapq.heappush(self.expiry_heap, (stale_until, key))
+        if len(self.expiry_heap) > 2 * len(self.entries) + 64:
+            self.expiry_heap = [
+                (entry[2], cached_key) for cached_key, entry in self.entries.items()
+            ]
+            heapq.heapify(self.expiry_heap)
 
 
 class MemoryCache:
-    """Thread-safe in-memory cache with TTL support."""
+    """
+    Thread-safe in-memory LRU cache with TTL support.
+
+    Entries are stored as ``(value, expires_at, stale_until)`` tuples keyed by
+    cache key. An entry is fresh until ``expires_at``; entries set with a
+    ``stale_ttl`` can still be read through ``get_stale`` until ``stale_until``.
+
+    Keys are spread over ``shards`` partitions by hash, each with its own
+    lock, LRU order and an equal share of ``max_size``, so writers to
+    different shards do not contend. The cache never holds more than
+    ``max_size`` entries, but with more than one shard eviction is least
+    recently used within a shard, so a full shard can evict while the cache
+    as a whole is below capacity.
+
+    Each shard keeps a min-heap of ``(stale_until, key)`` pairs. Every write
+    pops a few expired entries off it, so expired entries are reclaimed
+    before live ones are evicted, and ``purge_expired`` removes the rest
+    without scanning the whole cache. Heap records for keys that were since
+    overwritten or deleted are skipped when popped, and a heap is rebuilt
+    once such records outnumber its live entries.
+    """
 
-    def __init__(self, default_ttl: int = 300, max_size: int = 1000):
+    __slots__ = (
+        "_shards",
+        "_clock",
+        "default_ttl",
+        "max_size",
+        "_hits",
+        "_misses",
+    )
+
+    def __init__(
+        self,
+        default_ttl: int = 300,
+        max_size: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+        shards: int = 1,
+    ):
         """
         Initialize the memory cache.
 
         Args:
             default_ttl: Default TTL in seconds for cache entries.
             max_size: Maximum number of entries to store.
+            clock: Function returning the current time in seconds, used for
+                TTL calculations. Defaults to time.monotonic.
+            shards: Number of independently locked partitions (capped at
+                max_size). Defaults to 1, which gives exact LRU eviction.
+
+        Raises:
+            CacheError: If shards is less than 1.
         """
-        self._cache: Dict[str, CacheEntry] = {}
-        self._lock = Lock()
+        if shards < 1:
+            raise CacheError(f"shards must be at least 1, got {shards}")
+
+        # Never more shards than entries, so every shard can hold one; the
+        # capacities are split so that they add up to exactly max_size
+        shards = max(1, min(shards, max_size))
+        base, extra = divmod(max_size, shards)
+        self._shards: Tuple[_Shard, ...] = tuple(
+            _Shard(base + (1 if i < extra else 0)) for i in range(shards)
+        )
+        self._clock = clock
         self.default_ttl = default_ttl
         self.max_size = max_size
         self._hits = 0
         self._misses = 0
 
+    def _shard(self, key: str) -> _Shard:
+        """Return the shard holding key."""
+        shards = self._shards
+        if len(shards) == 1:
+            return shards[0]
+        return shards[hash(key) % len(shards)]
+
     def get(self, key: str) -> Optional[Any]:
         """
         Retrieve a value from the cache.
@@ -61,19 +176,71 @@ class MemoryCache:
         Returns:
             The cached value or None if not found or expired.
         """
-        with self._lock:
-            if key in self._cache:
-                entry = self._cache[key]
-                if not entry.is_expired():
+        now = self._clock()
+        # Shard selection is inlined on the read paths to keep hits cheap
+        shards = self._shards
+        shard = shards[0] if len(shards) == 1 else shards[hash(key) % len(shards)]
+        entries = shard.entries
+
+        # Fast path: single dict lookups are atomic under the GIL, so hits
+        # are served without waiting for the lock. The hit counter is
+        # advisory and may undercount slightly under heavy contention.
+        entry = entries.get(key)
+        if entry is not None and now < entry[1]:
+            shard.touch(key)
+            self._hits += 1
+            return entry[0]
+
+        with shard.lock:
+            entry = entries.get(key)
+            if entry is not None:
+                if now < entry[1]:
+                    entries.move_to_end(key)
                     self._hits += 1
-                    return entry.value
-                else:
-                    del self._cache[key]
+                    return entry[0]
+                if now >= entry[2]:
+                    del entries[key]
 
             self._misses += 1
             return None
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+    def get_stale(self, key: str) -> Tuple[Optional[Any], bool]:
+        """
+        Retrieve a value that may be past its TTL but within its stale window.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            Tuple of (value, is_stale). The value is None if the key is not
+            found or is past its stale window.
+        """
+        now = self._clock()
+        shards = self._shards
+        shard = shards[0] if len(shards) == 1 else shards[hash(key) % len(shards)]
+        entries = shard.entries
+
+        entry = entries.get(key)
+        if entry is not None and now < entry[1]:
+            shard.touch(key)
+            self._hits += 1
+            return entry[0], False
+
+        with shard.lock:
+            entry = entries.get(key)
+            if entry is not None:
+                if now < entry[2]:
+                    entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[0], now >= entry[1]
+                del entries[key]
+
+            self._misses += 1
+            return None, False
+
+    def set(
+        self, key: str, value: Any, ttl: Optional[int] = None, stale_ttl: int = 0
+    ) -> None:
         """
         Store a value in the cache.
 
@@ -81,18 +248,106 @@ class MemoryCache:
             key: The cache key.
             value: The value to cache.
             ttl: Optional TTL in seconds (uses default if not provided).
+            stale_ttl: Seconds after the TTL during which get_stale still
+                returns the value, flagged as stale.
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+
+        shard = self._shard(key)
+        entries = shard.entries
+
+        with shard.lock:
+            now = self._clock()
+            # Reclaim a few expired entries so they are dropped before any
+            # live entry is evicted
+            shard.purge(now, _WRITE_PURGE_LIMIT)
+
+            if key in entries:
+                entries.move_to_end(key)
+            else:
+                while entries and len(entries) >= shard.max_size:
+                    entries.popitem(last=False)
+
+            expires_at = now + ttl
+            stale_until = expires_at + stale_ttl
+            entries[key] = (value, expires_at, stale_until)
+            shard.push_expiry(stale_until, key)
+
+    def _group_by_shard(self, keys: Iterable[str]) -> Dict[_Shard, List[str]]:
+        """Split keys into per-shard lists, preserving their order."""
+        if len(self._shards) == 1:
+            return {self._shards[0]: list(keys)}
+
+        groups: Dict[_Shard, List[str]] = {}
+        for key in keys:
+            groups.setdefault(self._shard(key), []).append(key)
+        return groups
+
+    def mget(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Retrieve several values, taking each shard's lock once.
+
+        Args:
+            keys: The cache keys.
+
+        Returns:
+            Dictionary of the keys that were found and not expired.
+        """
+        now = self._clock()
+        found = {}
+
+        for shard, shard_keys in self._group_by_shard(keys).items():
+            entries = shard.entries
+            with shard.lock:
+                for key in shard_keys:
+                    entry = entries.get(key)
+                    if entry is not None:
+                        if now < entry[1]:
+                            entries.move_to_end(key)
+                            self._hits += 1
+                            found[key] = entry[0]
+                            continue
+                        if now >= entry[2]:
+                            del entries[key]
+                    self._misses += 1
+
+        return found
+
+    def mset(self, items: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """
+        Store several values, taking each shard's lock once.
+
+        Args:
+            items: Mapping of cache keys to values.
+            ttl: Optional TTL in seconds applied to every item (uses default if
+                not provided).
         """
         if ttl is None:
             ttl = self.default_ttl
 
-        with self._lock:
-            if len(self._cache) >= self.max_size:
-                self._evict_expired()
+        now = self._clock()
+        expires_at = now + ttl
+        for shard, shard_keys in self._group_by_shard(items).items():
+            entries = shard.entries
+            with shard.lock:
+                shard.purge(now, _WRITE_PURGE_LIMIT + len(shard_keys))
+                for key in shard_keys:
+                    entries[key] = (items[key], expires_at, expires_at)
+                    entries.move_to_end(key)
+                    shard.push_expiry(expires_at, key)
+
+                while len(entries) > shard.max_size:
+                    entries.popitem(last=False)
 
-                if len(self._cache) >= self.max_size:
-                    self._evict_oldest()
+    def __contains__(self, key: str) -> bool:
+        """
+        Check whether key currently has an entry.
 
-            self._cache[key] = CacheEntry(value, ttl)
+        Entries past their TTL that have not been dropped yet still count;
+        this is meant for bookkeeping, not for deciding whether to fetch.
+        """
+        return key in self._shard(key).entries
 
     def delete(self, key: str) -> bool:
         """
@@ -104,46 +359,103 @@ class MemoryCache:
         Returns:
             True if the key was removed, False if not found.
         """
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
+        shard = self._shard(key)
+        with shard.lock:
+            if key in shard.entries:
+                del shard.entries[key]
                 return True
             return False
 
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Remove several keys, taking each shard's lock once.
+
+        Args:
+            keys: The cache keys.
+
+        Returns:
+            The number of keys that were removed.
+        """
+        removed = 0
+        for shard, shard_keys in self._group_by_shard(keys).items():
+            with shard.lock:
+                for key in shard_keys:
+                    if shard.entries.pop(key, None) is not None:
+                        removed += 1
+        return removed
+
+    def delete_prefix(self, prefix: str) -> int:
+        """
+        Remove every key starting with prefix.
+
+        This scans all keys; callers that already know which keys they wrote
+        should use delete_many instead.
+
+        Args:
+            prefix: The key prefix.
+
+        Returns:
+            The number of entries removed.
+        """
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                matching = [key for key in shard.entries if key.startswith(prefix)]
+                for key in matching:
+                    del shard.entries[key]
+            removed += len(matching)
+        return removed
+
+    def iter_keys_snapshot(self) -> Iterator[str]:
+        """
+        Iterate over the keys present at the time of the call.
+
+        The keys are copied under each shard's lock, so the cache can be
+        modified while iterating. Expired entries not yet purged are included.
+        """
+        keys: List[str] = []
+        for shard in self._shards:
+            with shard.lock:
+                keys.extend(shard.entries)
+        return iter(keys)
+
     def clear(self) -> None:
         """Clear all entries from the cache."""
-        with self._lock:
-            self._cache.clear()
-            self._hits = 0
-            self._misses = 0
-
-    def _evict_expired(self) -> None:
-        """Remove expired entries from the cache."""
-        current_time = time.time()
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if entry.expires_at <= current_time
-        ]
-        for key in expired_keys:
-            del self._cache[key]
-
-    def _evict_oldest(self) -> None:
-        """Remove the oldest entry from the cache."""
-        if not self._cache:
-            return
-
-        oldest_key = min(
-            self._cache.keys(),
-            key=lambda k: self._cache[k].expires_at
-        )
-        del self._cache[oldest_key]
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.expiry_heap.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def purge_expired(self) -> int:
+        """
+        Remove all expired entries (including their stale window) from the cache.
+
+        Every write already drops a few of the oldest expired entries, and
+        reads drop the entries they find expired, so this is only needed to
+        reclaim memory from a cache that has stopped receiving writes.
+
+        Returns:
+            The number of entries removed.
+        """
+        now = self._clock()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += shard.purge(now)
+        return removed
 
     def get_stats(self) -> Dict[str, int]:
-        """Get cache statistics."""
-        with self._lock:
-            return {
-                "hits": self._hits,
-                "misses": self._misses,
-                "size": len(self._cache),
-                "max_size": self.max_size,
-            }
\ No newline at end of file
+        """
+        Get cache statistics.
+
+        The values are read without locking, so under concurrent use they
+        may be momentarily inconsistent with each other.
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "size": sum(len(shard.entries) for shard in self._shards),
+            "max_size": self.max_size,
+        }
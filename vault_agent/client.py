@@ -15,9 +15,11 @@
 """Vault Agent Client with AppRole authentication and caching."""
 
 import logging
-from typing import Optional
+import time
+from threading import Lock
+from typing import Any, Dict, Optional
 import hvac
-from hvac.exceptions import InvalidRequest, Forbidden
+import requests
 
 from .cache import MemoryCache
 from .secrets import KVSecrets, DatabaseSecrets
@@ -25,6 +27,13 @@ from .utils.exceptions import AuthenticationError
 
 logger = logging.getLogger(__name__)
 
+# Re-check the token after this fraction of its remaining TTL has elapsed
+AUTH_RECHECK_BUFFER = 0.8
+# Re-check interval in seconds for tokens that never expire
+AUTH_RECHECK_INTERVAL = 300
+# Tokens with fewer seconds than this left are replaced with a new login
+AUTH_MIN_TTL = 60
+
 
 class VaultAgentClient:
     """Extended Vault client with caching and automatic re-authentication."""
@@ -40,6 +49,8 @@ class VaultAgentClient:
         verify: bool = True,
         kv_mount_point: str = "secret",
         database_mount_point: str = "database",
+        cache_stale_ttl: int = 0,
+        cache_shards: int = 1,
     ):
         """
         Initialize the Vault Agent client.
@@ -54,6 +65,11 @@ class VaultAgentClient:
             verify: Whether to verify SSL certificates.
             kv_mount_point: KV secrets engine mount point.
             database_mount_point: Database secrets engine mount point.
+            cache_stale_ttl: Seconds after expiry during which cached KV
+                secrets are still served while refreshed in the background.
+            cache_shards: Number of independently locked cache partitions.
+                More shards reduce lock contention between threads, at the
+                cost of least-recently-used eviction only within a shard.
         """
         self.url = url
         self.role_id = role_id
@@ -61,26 +77,62 @@ class VaultAgentClient:
         self.namespace = namespace
         self.verify = verify
 
-        self.cache = MemoryCache(default_ttl=cache_ttl, max_size=max_cache_size)
+        self.cache = MemoryCache(
+            default_ttl=cache_ttl, max_size=max_cache_size, shards=cache_shards
+        )
 
+        # One HTTP session for the life of the client keeps connections alive
+        # across re-authentication
+        self._session = requests.Session()
+        # hvac takes verify from the session when one is given, ignoring its
+        # own verify argument
+        self._session.verify = verify
         self._client = None
+        self._login_client = None
+        self._auth_valid_until = 0.0
+        self._auth_lock = Lock()
         self._authenticate()
 
-        self.kv = KVSecrets(self._get_client(), self.cache, kv_mount_point)
-        self.database = DatabaseSecrets(self._get_client(), self.cache, database_mount_point)
+        self.kv = KVSecrets(
+            self._get_client(),
+            self.cache,
+            kv_mount_point,
+            stale_ttl=cache_stale_ttl,
+            reauthenticate=self._reauthenticate_after_forbidden,
+        )
+        self.database = DatabaseSecrets(
+            self._get_client(),
+            self.cache,
+            database_mount_point,
+            reauthenticate=self._reauthenticate_after_forbidden,
+        )
 
     def _authenticate(self) -> None:
-        """Authenticate with Vault using AppRole."""
+        """
+        Authenticate with Vault using AppRole.
+
+        The hvac client is created once and reused; re-authentication only
+        replaces its token, so objects holding the client stay valid. The
+        login itself goes through a separate token-less client on the same
+        session, so requests in flight on the shared client keep their token
+        until the new one is in place.
+        """
         try:
-            self._client = hvac.Client(
-                url=self.url, namespace=self.namespace, verify=self.verify
-            )
+            if self._client is None:
+                self._client = self._new_hvac_client()
+                self._login_client = self._new_hvac_client()
 
-            response = self._client.auth.approle.login(
-                role_id=self.role_id, secret_id=self.secret_id
+            response = self._login_client.auth.approle.login(
+                role_id=self.role_id, secret_id=self.secret_id, use_token=False
             )
 
-            self._client.token = response["auth"]["client_token"]
+            auth = response["auth"]
+            self._client.token = auth["client_token"]
+            lease_duration = auth.get("lease_duration", 0)
+            if lease_duration == 0 and not auth.get("renewable"):
+                self._mark_authenticated(None)
+            else:
+                self._mark_authenticated(lease_duration)
 
             logger.info("Successfully authenticated with Vault")
 
@@ -88,6 +140,15 @@ class VaultAgentClient:
             logger.error(f"Failed to authenticate with Vault: {e}")
             raise AuthenticationError(f"Failed to authenticate: {e}")
 
+    def _new_hvac_client(self) -> hvac.Client:
+        """Create an hvac client on the shared HTTP session."""
+        return hvac.Client(
+            url=self.url,
+            namespace=self.namespace,
+            verify=self.verify,
+            session=self._session,
+        )
+
     def _get_client(self) -> hvac.Client:
         """
         Get the Vault client, re-authenticating if needed.
@@ -101,24 +162,87 @@ class VaultAgentClient:
 
         return self._client  # type: ignore
 
+    def _reauthenticate_after_forbidden(self, rejected_token: Optional[str]) -> None:
+        """
+        Log in again after Vault rejected a token with 403.
+
+        Threads that were rejected with the same token share one login; if
+        the token has already been replaced, nothing is done.
+
+        Args:
+            rejected_token: The token the failed request was sent with.
+        """
+        with self._auth_lock:
+            if self._client is not None and self._client.token != rejected_token:
+                return
+            logger.info("Token rejected by Vault, re-authenticating")
+            self._auth_valid_until = 0.0
+            self._authenticate()
+
     def _is_authenticated(self) -> bool:
-        """Check if the client is authenticated."""
+        """
+        Check if the client is authenticated.
+
+        The token is only looked up again once most of its remaining TTL has
+        elapsed; in between this is a local timestamp comparison. Tokens
+        close to expiry are reported as unauthenticated so they are replaced
+        before Vault starts rejecting them.
+        """
         if not self._client:
             return False
 
+        if time.monotonic() < self._auth_valid_until:
+            return True
+
         try:
-            self._client.sys.read_health_status()
-            return self._client.is_authenticated()
-        except (InvalidRequest, Forbidden):
-            return False
+            response = self._client.auth.token.lookup_self()
         except Exception:
+            self._auth_valid_until = 0.0
+            return False
+
+        ttl = self._remaining_ttl(response["data"])
+        if ttl is not None and ttl < AUTH_MIN_TTL:
+            self._auth_valid_until = 0.0
             return False
 
+        self._mark_authenticated(ttl)
+        return True
+
+    @staticmethod
+    def _remaining_ttl(token_data: Dict[str, Any]) -> Optional[int]:
+        """
+        Get the remaining TTL from a token lookup.
+
+        Returns:
+            Remaining TTL in seconds, or None if the token never expires. A
+            token without an expire_time never expires; a TTL of 0 on any
+            other token means it has run out.
+        """
+        if token_data.get("expire_time") is None:
+            return None
+        return token_data.get("ttl", 0)
+
+    def _mark_authenticated(self, ttl: Optional[int]) -> None:
+        """
+        Record that the current token is valid.
+
+        Args:
+            ttl: Remaining token TTL in seconds, or None for a token that
+                never expires.
+        """
+        if ttl is None:
+            recheck_in = AUTH_RECHECK_INTERVAL
+        else:
+            recheck_in = ttl * AUTH_RECHECK_BUFFER
+        self._auth_valid_until = time.monotonic() + recheck_in
+
     def __getattr__(self, name):
         """
         Proxy attribute access to the underlying hvac client.
 
-        This allows direct access to hvac client methods when needed.
+        This allows direct access to hvac client methods when needed. Every
+        access goes through _get_client so an expired token is renewed; while
+        the token is known to be valid that check is a timestamp comparison.
         """
         client = self._get_client()
         return getattr(client, name)
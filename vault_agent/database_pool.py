@@ -16,17 +16,60 @@
 
 import time
 import logging
-from typing import Any, Dict, Optional, Type, Callable
+from typing import Any, Dict, Optional, Tuple, Type, Callable
 from contextlib import contextmanager
-from threading import Lock, Thread
+from threading import Event, Lock, Thread
 import warnings
+from collections import namedtuple
+from weakref import WeakKeyDictionary
 
 logger = logging.getLogger(__name__)
 
+_monotonic = time.monotonic
+
+# Credentials within this many seconds of lease expiry are refreshed inline,
+# blocking the caller; before that point they are refreshed in the background.
+SYNC_EXPIRATION_BUFFER = 60
+
+# Shortest time the background refresh thread sleeps between checks
+MIN_REFRESH_DELAY = 1.0
+
+Credentials = namedtuple("Credentials", ("user", "password"))
+
+CREDENTIALS_VALID = "valid"
+CREDENTIALS_NEAR_EXPIRY = "near_expiry"
+CREDENTIALS_EXPIRED = "expired"
+
 
 class DatabaseConnectionManager:
     """Manages database connection pools with automatic credential refresh from Vault."""
 
+    __slots__ = (
+        "vault_client",
+        "_generate_credentials",
+        "_mount_point",
+        "role",
+        "pool_class",
+        "pool_kwargs",
+        "_pool_config",
+        "refresh_buffer",
+        "validation_query",
+        "on_refresh",
+        "validation_interval",
+        "pool",
+        "_pool_handle",
+        "credentials",
+        "credentials_expire_at",
+        "credentials_hard_expire_at",
+        "_lock",
+        "_refresh_lock",
+        "_async_refresh_thread",
+        "_pool_generation",
+        "_last_used",
+        "_validation_cursors",
+        "_closing",
+    )
+
     def __init__(
         self,
         vault_client,
@@ -36,6 +79,7 @@ class DatabaseConnectionManager:
         refresh_buffer: float = 0.8,
         validation_query: str = "SELECT 1",
         on_refresh: Optional[Callable] = None,
+        validation_interval: float = 30.0,
     ):
         """
         Initialize the connection manager.
@@ -43,68 +87,182 @@ class DatabaseConnectionManager:
         Args:
             vault_client: VaultAgentClient instance.
             role: Database role name in Vault.
-            pool_class: Connection pool class (e.g., psycopg2.pool.SimpleConnectionPool).
+            pool_class: Connection pool class (e.g.,
+                psycopg2.pool.ThreadedConnectionPool). Checkouts from a
+                psycopg2 pool without its own lock, such as
+                SimpleConnectionPool, are serialized by the manager so they
+                cannot race a background credential refresh.
             pool_kwargs: Additional kwargs for pool initialization.
             refresh_buffer: Refresh credentials when this percentage of TTL remains (0.8 = 80%).
             validation_query: Query to validate connections.
             on_refresh: Optional callback when credentials are refreshed.
+            validation_interval: Only validate connections that have been idle
+                in the pool for at least this many seconds (0 validates every
+                checkout).
         """
         self.vault_client = vault_client
+        # Resolved once; the client keeps the same hvac instance across re-auth
+        self._generate_credentials = (
+            vault_client.database.client.secrets.database.generate_credentials
+        )
+        self._mount_point = vault_client.database.mount_point
         self.role = role
         self.pool_class = pool_class
         self.pool_kwargs = pool_kwargs or {}
+        # Pool kwargs plus credentials; only the credential keys change on refresh
+        self._pool_config = dict(self.pool_kwargs)
         self.refresh_buffer = refresh_buffer
         self.validation_query = validation_query
         self.on_refresh = on_refresh
+        self.validation_interval = validation_interval
 
         self.pool = None
+        # (pool, checkout function, checkin function) resolved once per pool
+        self._pool_handle = (None, None, None)
         self.credentials = None
-        self.credentials_expire_at = None
+        # Monotonic timestamps (time.monotonic), not wall-clock time.
+        # credentials_expire_at is when a background refresh starts;
+        # credentials_hard_expire_at is when callers block on a refresh.
+        self.credentials_expire_at = 0.0
+        self.credentials_hard_expire_at = 0.0
         self._lock = Lock()
+        self._refresh_lock = Lock()
+        self._async_refresh_thread = None
+        # Bumped each time the pool is pointed at new credentials
+        self._pool_generation = 0
+        # Monotonic time each connection was last returned to the pool
+        self._last_used = WeakKeyDictionary()
+        # Validation cursor kept per connection; dropped when the connection
+        # closes because the cursor holds a reference back to it
+        self._validation_cursors = WeakKeyDictionary()
         self._closing = False
 
         self._initialize_pool()
 
     def _initialize_pool(self) -> None:
         """Initialize the connection pool with fresh credentials."""
-        self._refresh_credentials()
-        self._create_pool()
+        self._refresh_pool()
+
+    def _refresh_pool(self) -> None:
+        """Fetch fresh credentials and recreate the pool, one refresher at a time."""
+        with self._refresh_lock:
+            self._refresh_credentials()
+            self._create_pool()
+
+    def _refresh_pool_if_expired(self) -> None:
+        """
+        Refresh credentials if they are due for renewal.
+
+        The expiry check is done without a lock on the common path and repeated
+        under the refresh lock, so concurrent callers trigger a single refresh.
+        """
+        if not self._should_refresh_credentials():
+            return
+
+        with self._refresh_lock:
+            if self._should_refresh_credentials():
+                self._refresh_credentials()
+                self._create_pool()
 
     def _refresh_credentials(self) -> None:
         """Fetch fresh credentials from Vault."""
         logger.info(f"Refreshing database credentials for role: {self.role}")
 
-        response = self.vault_client.database.client.secrets.database.generate_credentials(
-            name=self.role,
-            mount_point=self.vault_client.database.mount_point
+        response = self._generate_credentials(
+            name=self.role, mount_point=self._mount_point
         )
 
-        self.credentials = {
-            "user": response["data"]["username"],
-            "password": response["data"]["password"],
-        }
+        self.credentials = Credentials(
+            response["data"]["username"], response["data"]["password"]
+        )
 
         lease_duration = response.get("lease_duration", 3600)
         effective_ttl = lease_duration * self.refresh_buffer
-        self.credentials_expire_at = time.time() + effective_ttl
+        now = _monotonic()
+        self.credentials_expire_at = now + effective_ttl
+        self.credentials_hard_expire_at = now + max(
+            effective_ttl, lease_duration - SYNC_EXPIRATION_BUFFER
+        )
 
         logger.info(f"Credentials refreshed, will refresh again in {effective_ttl} seconds")
 
         if self.on_refresh:
-            self.on_refresh(self.credentials)
+            self.on_refresh(self.credentials._asdict())
 
     def _create_pool(self) -> None:
-        """Create a new connection pool with current credentials."""
+        """
+        Point the connection pool at the current credentials.
+
+        psycopg2-style pools are kept and rebound to the new credentials so
+        that only idle connections are dropped. Other pool types are replaced
+        with a new pool and the old one is closed.
+        """
+        if self.pool is not None and self._rebind_pool(self.pool):
+            logger.info("Connection pool rebound to fresh credentials")
+            return
+
+        self._pool_config["user"] = self.credentials.user
+        self._pool_config["password"] = self.credentials.password
+        new_pool = self.pool_class(**self._pool_config)
+
+        handle = (new_pool, *self._resolve_pool_methods(new_pool))
+
         with self._lock:
             old_pool = self.pool
+            self.pool = new_pool
+            self._pool_handle = handle
+            self._pool_generation += 1
+
+        if old_pool:
+            self._validation_cursors.clear()
+            self._close_pool_gracefully(old_pool)
 
-            pool_config = {**self.pool_kwargs, **self.credentials}
-            self.pool = self.pool_class(**pool_config)
+        logger.info("Connection pool created with fresh credentials")
 
-            if old_pool:
-                self._close_pool_gracefully(old_pool)
+    def _rebind_pool(self, pool: Any) -> bool:
+        """
+        Switch an existing psycopg2-style pool to the current credentials.
+
+        New connections are opened with the new credentials, idle ones are
+        closed, and connections checked out before the switch are closed when
+        they are returned.
 
-            logger.info("Connection pool created with fresh credentials")
+        Args:
+            pool: The pool to rebind.
+
+        Returns:
+            True if the pool was rebound, False if the pool type is unsupported.
+        """
+        kwargs = getattr(pool, "_kwargs", None)
+        idle = getattr(pool, "_pool", None)
+        if not isinstance(kwargs, dict) or not isinstance(idle, list):
+            return False
+        if getattr(pool, "closed", False):
+            return False
+
+        # Pools without their own lock are guarded by the manager's lock,
+        # which their checkouts also take (see _resolve_pool_methods)
+        with getattr(pool, "_lock", None) or self._lock:
+            kwargs["user"] = self.credentials.user
+            kwargs["password"] = self.credentials.password
+            self._drain_idle(pool)
+            self._pool_generation += 1
+
+        return True
+
+    def _drain_idle(self, pool: Any) -> None:
+        """Close the idle connections of a psycopg2-style pool (pool lock held)."""
+        idle = pool._pool
+        while idle:
+            try:
+                conn = idle.pop()
+            except IndexError:
+                break
+            self._forget_validation_cursor(conn)
+            try:
+                conn.close()
+            except Exception as e:
+                logger.debug(f"Error closing idle connection: {e}")
 
     def _close_pool_gracefully(self, pool: Any) -> None:
         """Close a connection pool gracefully."""
@@ -121,21 +279,73 @@ class DatabaseConnectionManager:
 
     def _should_refresh_credentials(self) -> bool:
         """Check if credentials should be refreshed."""
-        if not self.credentials_expire_at:
-            return True
-        return time.time() >= self.credentials_expire_at
+        return _monotonic() >= self.credentials_expire_at
+
+    def _credential_status(self) -> str:
+        """
+        Classify the current credentials.
+
+        Returns:
+            CREDENTIALS_VALID, CREDENTIALS_NEAR_EXPIRY (refresh in the
+            background) or CREDENTIALS_EXPIRED (refresh before use).
+        """
+        now = _monotonic()
+        if now >= self.credentials_hard_expire_at:
+            return CREDENTIALS_EXPIRED
+        if now >= self.credentials_expire_at:
+            return CREDENTIALS_NEAR_EXPIRY
+        return CREDENTIALS_VALID
+
+    def _start_async_refresh(self) -> None:
+        """Refresh credentials in a background thread unless one is already running."""
+        with self._lock:
+            thread = self._async_refresh_thread
+            if thread is not None and thread.is_alive():
+                return
+            thread = Thread(target=self._async_refresh, daemon=True)
+            self._async_refresh_thread = thread
+        thread.start()
+
+    def _async_refresh(self) -> None:
+        """Background refresh target; failures are retried on the next checkout."""
+        try:
+            self._refresh_pool_if_expired()
+        except Exception as e:
+            logger.error(f"Asynchronous credential refresh failed: {e}")
 
     def _validate_connection(self, conn: Any) -> bool:
-        """Validate a database connection."""
+        """Validate a database connection, reusing its validation cursor."""
         try:
-            cursor = conn.cursor()
+            cursor = self._validation_cursors.get(conn)
+        except TypeError:
+            cursor = None
+
+        try:
+            if cursor is None:
+                cursor = conn.cursor()
+                try:
+                    self._validation_cursors[conn] = cursor
+                except TypeError:
+                    pass
             cursor.execute(self.validation_query)
-            cursor.close()
             return True
         except Exception as e:
             logger.debug(f"Connection validation failed: {e}")
+            self._forget_validation_cursor(conn)
             return False
 
+    def _forget_validation_cursor(self, conn: Any) -> None:
+        """Close and drop the cached validation cursor for a connection."""
+        try:
+            cursor = self._validation_cursors.pop(conn, None)
+        except TypeError:
+            return
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
     @contextmanager
     def get_connection(self, retry: bool = True):
         """
@@ -153,22 +363,29 @@ class DatabaseConnectionManager:
         if self._closing:
             raise RuntimeError("Connection manager is closing")
 
-        if self._should_refresh_credentials():
-            self._refresh_credentials()
-            self._create_pool()
+        status = self._credential_status()
+        if status == CREDENTIALS_EXPIRED:
+            self._refresh_pool_if_expired()
+        elif status == CREDENTIALS_NEAR_EXPIRY:
+            self._start_async_refresh()
 
+        # Connections go back to the pool they came from, even if the pool
+        # has been swapped by a refresh in the meantime
+        pool, get_conn, put_conn = self._pool_handle
+        generation = self._pool_generation
         conn = None
         try:
-            conn = self._get_connection_from_pool()
+            conn = get_conn()
 
-            if not self._validate_connection(conn):
+            if self._needs_validation(conn) and not self._validate_connection(conn):
                 if retry:
                     logger.info("Connection validation failed, refreshing credentials")
-                    self._return_connection_to_pool(conn)
+                    self._return_connection_to_pool(conn, put_conn)
                     conn = None
-                    self._refresh_credentials()
-                    self._create_pool()
-                    conn = self._get_connection_from_pool()
+                    self._refresh_pool()
+                    pool, get_conn, put_conn = self._pool_handle
+                    generation = self._pool_generation
+                    conn = get_conn()
                 else:
                     raise Exception("Connection validation failed")
 
@@ -176,38 +393,95 @@ class DatabaseConnectionManager:
 
         finally:
             if conn:
-                self._return_connection_to_pool(conn)
+                # A rebound pool keeps the same object, so connections opened
+                # with the previous credentials are closed instead of reused
+                stale = generation != self._pool_generation and pool is self.pool
+                self._return_connection_to_pool(conn, put_conn, close=stale)
 
-    def _get_connection_from_pool(self) -> Any:
-        """Get a connection from the pool (implementation depends on pool type)."""
-        with self._lock:
-            if hasattr(self.pool, "getconn"):
-                return self.pool.getconn()
-            elif hasattr(self.pool, "connection"):
-                return self.pool.connection()
-            elif hasattr(self.pool, "get"):
-                return self.pool.get()
-            else:
-                raise NotImplementedError(f"Unsupported pool type: {type(self.pool)}")
+    def _needs_validation(self, conn: Any) -> bool:
+        """Check whether a connection has been idle long enough to need validating."""
+        try:
+            last_used = self._last_used.get(conn)
+        except TypeError:
+            return True
+        return last_used is None or _monotonic() - last_used >= self.validation_interval
 
-    def _return_connection_to_pool(self, conn: Any) -> None:
-        """Return a connection to the pool (implementation depends on pool type)."""
+    def _resolve_pool_methods(self, pool: Any) -> Tuple[Callable, Optional[Callable]]:
+        """
+        Look up the checkout and checkin methods for a pool type.
+
+        This is done once per pool so the per-connection path is a direct call.
+        Pools that synchronize checkout internally (ThreadedConnectionPool,
+        SQLAlchemy) are called without a lock. psycopg2 pools without their
+        own lock, such as SimpleConnectionPool, are wrapped in the manager's
+        lock, since a credential refresh rebinds them from another thread.
+
+        Returns:
+            Tuple of (checkout function, checkin function or None).
+        """
+        get_conn = (
+            getattr(pool, "getconn", None)
+            or getattr(pool, "connection", None)
+            or getattr(pool, "get", None)
+        )
+        if get_conn is None:
+            def get_conn():
+                raise NotImplementedError(f"Unsupported pool type: {type(pool)}")
+
+        put_conn = getattr(pool, "putconn", None)
+
+        rebindable = isinstance(getattr(pool, "_kwargs", None), dict) and isinstance(
+            getattr(pool, "_pool", None), list
+        )
+        if rebindable and getattr(pool, "_lock", None) is None:
+            lock = self._lock
+            unlocked_get, unlocked_put = get_conn, put_conn
+
+            def get_conn():
+                with lock:
+                    return unlocked_get()
+
+            if unlocked_put is not None:
+                def put_conn(conn, **kwargs):
+                    with lock:
+                        unlocked_put(conn, **kwargs)
+
+        return get_conn, put_conn
+
+    def _return_connection_to_pool(
+        self, conn: Any, put_conn: Optional[Callable], close: bool = False
+    ) -> None:
+        """Return a connection to its pool (implementation depends on pool type)."""
         try:
-            with self._lock:
-                if hasattr(self.pool, "putconn"):
-                    self.pool.putconn(conn)
-                elif hasattr(conn, "close"):
-                    pass
+            if put_conn is not None:
+                if close:
+                    self._forget_validation_cursor(conn)
+                    put_conn(conn, close=True)
                 else:
-                    warnings.warn("Unable to return connection to pool properly")
+                    self._mark_used(conn)
+                    put_conn(conn)
+                    # The pool may close surplus connections on checkin
+                    closed = getattr(conn, "closed", False)
+                    if isinstance(closed, int) and closed:
+                        self._forget_validation_cursor(conn)
+            elif hasattr(conn, "close"):
+                pass
+            else:
+                warnings.warn("Unable to return connection to pool properly")
         except Exception as e:
             logger.debug(f"Error returning connection to pool: {e}")
 
+    def _mark_used(self, conn: Any) -> None:
+        """Record when a connection went back to the pool."""
+        try:
+            self._last_used[conn] = _monotonic()
+        except TypeError:
+            pass
+
     def refresh_now(self) -> None:
         """Force immediate credential refresh and pool recreation."""
         logger.info("Forcing credential refresh")
-        self._refresh_credentials()
-        self._create_pool()
+        self._refresh_pool()
 
     def close(self) -> None:
         """Close the connection manager and all connections."""
@@ -216,6 +490,9 @@ class DatabaseConnectionManager:
             if self.pool:
                 self._close_pool_gracefully(self.pool)
                 self.pool = None
+                self._pool_handle = (None, None, None)
+            self._validation_cursors.clear()
+            self._last_used.clear()
         logger.info("Connection manager closed")
 
     def __enter__(self):
@@ -230,18 +507,23 @@ class DatabaseConnectionManager:
 class BackgroundRefreshManager(DatabaseConnectionManager):
     """Connection manager with background credential refresh thread."""
 
+    __slots__ = ("check_interval", "_refresh_thread", "_stop_event")
+
     def __init__(self, *args, check_interval: int = 60, **kwargs):
         """
         Initialize with background refresh capability.
 
+        The refresh thread sleeps until the credentials are due for refresh
+        rather than polling on a fixed interval.
+
         Args:
-            check_interval: How often to check for credential expiry (seconds).
+            check_interval: How long to wait before retrying a failed refresh (seconds).
             *args, **kwargs: Arguments for DatabaseConnectionManager.
         """
         super().__init__(*args, **kwargs)
         self.check_interval = check_interval
         self._refresh_thread = None
-        self._stop_refresh = False
+        self._stop_event = Event()
         self._start_background_refresh()
 
     def _start_background_refresh(self) -> None:
@@ -250,22 +532,29 @@ class BackgroundRefreshManager(DatabaseConnectionManager):
         self._refresh_thread.start()
         logger.info("Background credential refresh thread started")
 
+    def _next_refresh_delay(self) -> float:
+        """Seconds until the current credentials are due for refresh."""
+        return max(MIN_REFRESH_DELAY, self.credentials_expire_at - _monotonic())
+
     def _background_refresh_loop(self) -> None:
         """Background thread loop to refresh credentials proactively."""
-        while not self._stop_refresh:
+        while not self._stop_event.is_set():
             try:
                 if self._should_refresh_credentials():
                     logger.info("Background thread refreshing credentials")
-                    self._refresh_credentials()
-                    self._create_pool()
+                    self._refresh_pool_if_expired()
+                delay = self._next_refresh_delay()
             except Exception as e:
                 logger.error(f"Background refresh failed: {e}")
+                delay = self.check_interval
 
-            time.sleep(self.check_interval)
+            # Returns early as soon as close() sets the event
+            if self._stop_event.wait(delay):
+                return
 
     def close(self) -> None:
         """Close the manager and stop background thread."""
-        self._stop_refresh = True
+        self._stop_event.set()
         if self._refresh_thread:
             self._refresh_thread.join(timeout=5)
         super().close()
\ No newline at end of file
@@ -1,21 +1,56 @@
 """Database secrets engine with caching."""
 
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+from threading import Lock
 import logging
 
 import hvac
+from hvac.exceptions import Forbidden, InvalidPath, InvalidRequest
 
 from ..cache import MemoryCache
 from ..utils.exceptions import SecretNotFoundError
+from ..utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Cached in place of credentials for roles Vault reported as missing
+_MISS_SENTINEL = object()
+
+# Size below which the cache key index is never pruned
+_KEY_INDEX_MIN_PRUNE = 256
+
+# Upper bound on concurrent Vault requests made by one batch call
+MAX_BATCH_WORKERS = 16
+
 
 class DatabaseSecrets:
     """Manages Database secrets with caching support."""
 
+    __slots__ = (
+        "client",
+        "cache",
+        "mount_point",
+        "negative_ttl",
+        "_dynamic_prefix",
+        "_static_prefix",
+        "_cache_keys",
+        "_cache_keys_lock",
+        "_cache_keys_prune_at",
+        "_inflight",
+        "_reauthenticate",
+    )
+
+    # Cache TTL in seconds for static credentials when none is given
+    _STATIC_DEFAULT_TTL = 300
+
     def __init__(
-        self, client: hvac.Client, cache: MemoryCache, mount_point: str = "database"
+        self,
+        client: hvac.Client,
+        cache: MemoryCache,
+        mount_point: str = "database",
+        negative_ttl: int = 10,
+        reauthenticate: Optional[Callable[[Optional[str]], None]] = None,
     ):
         """
         Initialize Database secrets manager.
@@ -24,55 +59,234 @@ class DatabaseSecrets:
             client: The Vault client instance.
             cache: The cache instance to use.
             mount_point: The database engine mount point.
+            negative_ttl: Seconds to remember that a role was not found, so
+                repeated lookups fail without querying Vault. 0 disables this.
+            reauthenticate: Optional callback invoked with the rejected token
+                when Vault answers 403, before the request is retried once.
         """
         self.client = client
         self.cache = cache
         self.mount_point = mount_point
+        self.negative_ttl = negative_ttl
+        # Cache key prefixes, built once so lookups only concatenate the role
+        self._dynamic_prefix = f"db:{mount_point}:"
+        self._static_prefix = f"db:static:{mount_point}:"
+        # Keys this instance has written, so clear_cache never scans the cache
+        self._cache_keys: Set[str] = set()
+        self._cache_keys_lock = Lock()
+        self._cache_keys_prune_at = _KEY_INDEX_MIN_PRUNE
+        # Concurrent misses for the same key share one Vault request
+        self._inflight = SingleFlight()
+        self._reauthenticate = reauthenticate
+
+    def _vault_call(self, method: Callable[..., Any], **kwargs) -> Any:
+        """
+        Call a Vault API method, re-authenticating once if the token is rejected.
+
+        Args:
+            method: The hvac method to call.
+            **kwargs: Arguments for the method.
+
+        Returns:
+            The method's response.
+        """
+        token = self.client.token
+        try:
+            return method(**kwargs)
+        except Forbidden:
+            if self._reauthenticate is None:
+                raise
+            self._reauthenticate(token)
+            return method(**kwargs)
+
+    def _cache_set(
+        self, key: str, value: Any, ttl: Optional[int] = None, stale_ttl: int = 0
+    ) -> None:
+        """
+        Store a value in the cache and record its key for clear_cache.
+
+        Keys the cache has since evicted or expired are dropped from the
+        index whenever it doubles in size, so it stays proportional to the
+        number of live entries.
+        """
+        with self._cache_keys_lock:
+            self.cache.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+            self._cache_keys.add(key)
+            if len(self._cache_keys) > self._cache_keys_prune_at:
+                self._cache_keys = {k for k in self._cache_keys if k in self.cache}
+                self._cache_keys_prune_at = max(
+                    2 * len(self._cache_keys), _KEY_INDEX_MIN_PRUNE
+                )
+
+    def _cache_miss(self, key: str) -> None:
+        """Remember that Vault has nothing at key for negative_ttl seconds."""
+        if self.negative_ttl:
+            self._cache_set(key, _MISS_SENTINEL, ttl=self.negative_ttl)
 
     def get_credentials(self, role: str, ttl: Optional[int] = None) -> Dict[str, Any]:
         """
         Get database credentials for a role.
 
+        Credentials cached with a TTL shorter than their lease are returned
+        as-is once the TTL passes, while a background refresh renews their
+        lease (or fetches new ones if it cannot be renewed); callers only
+        block on Vault once the lease itself has expired.
+
         Args:
             role: The database role name.
             ttl: Optional cache TTL for these credentials.
 
         Returns:
-            Dictionary containing username and password.
+            Dictionary containing username, password and lease_id.
 
         Raises:
             SecretNotFoundError: If the role is not found.
         """
-        cache_key = f"db:{self.mount_point}:{role}"
+        cache_key = self._dynamic_prefix + role
 
-        cached_creds = self.cache.get(cache_key)
+        cached_creds, is_stale = self.cache.get_stale(cache_key)
+        if cached_creds is _MISS_SENTINEL:
+            raise SecretNotFoundError("Database role", role)
         if cached_creds is not None:
-            logger.debug(f"Cache hit for database role: {role}")
+            if is_stale:
+                logger.debug("Stale cache hit for database role: %s, refreshing", role)
+                self._inflight.submit(
+                    cache_key,
+                    lambda: self._refresh_credentials(role, ttl, cache_key, cached_creds),
+                )
+            else:
+                logger.debug("Cache hit for database role: %s", role)
             return cached_creds
 
-        logger.debug(f"Cache miss for database role: {role}, fetching from Vault")
+        logger.debug("Cache miss for database role: %s, fetching from Vault", role)
+
+        return self._inflight.do(
+            cache_key, lambda: self._fetch_credentials(role, ttl, cache_key)
+        )
+
+    def mget_credentials(
+        self, roles: Iterable[str], ttl: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get database credentials for several roles.
+
+        Cached credentials are returned directly; the remaining roles are
+        fetched from Vault concurrently.
 
+        Args:
+            roles: The database role names.
+            ttl: Optional cache TTL for newly fetched credentials.
+
+        Returns:
+            Dictionary mapping each role to its credentials.
+
+        Raises:
+            SecretNotFoundError: If any role is not found.
+        """
+        roles = list(dict.fromkeys(roles))
+        cached = self.cache.mget(self._dynamic_prefix + role for role in roles)
+
+        results = {}
+        misses = []
+        for role in roles:
+            creds = cached.get(self._dynamic_prefix + role)
+            if creds is None or creds is _MISS_SENTINEL:
+                misses.append(role)
+            else:
+                results[role] = creds
+
+        if len(misses) == 1:
+            results[misses[0]] = self.get_credentials(misses[0], ttl)
+        elif misses:
+            with ThreadPoolExecutor(
+                max_workers=min(len(misses), MAX_BATCH_WORKERS)
+            ) as executor:
+                fetched = executor.map(
+                    lambda role: self.get_credentials(role, ttl), misses
+                )
+                results.update(zip(misses, fetched))
+
+        return results
+
+    def _fetch_credentials(
+        self, role: str, ttl: Optional[int], cache_key: str
+    ) -> Dict[str, Any]:
+        """Generate credentials in Vault and cache them."""
         try:
-            response = self.client.secrets.database.generate_credentials(
+            response = self._vault_call(
+                self.client.secrets.database.generate_credentials,
                 name=role, mount_point=self.mount_point
             )
 
+            data = response["data"]
             credentials = {
-                "username": response["data"]["username"],
-                "password": response["data"]["password"],
+                "username": data["username"],
+                "password": data["password"],
+                "lease_id": response.get("lease_id"),
             }
 
             lease_duration = response.get("lease_duration", 3600)
-            cache_ttl = min(ttl or lease_duration, lease_duration)
-
-            self.cache.set(cache_key, credentials, ttl=cache_ttl)
+            self._cache_credentials(cache_key, credentials, lease_duration, ttl)
 
             return credentials
 
-        except Exception as e:
-            if "400" in str(e) or "role" in str(e).lower():
-                raise SecretNotFoundError(f"Database role not found: {role}")
-            raise
+        except (InvalidPath, InvalidRequest):
+            self._cache_miss(cache_key)
+            raise SecretNotFoundError("Database role", role)
+
+    def _refresh_credentials(
+        self,
+        role: str,
+        ttl: Optional[int],
+        cache_key: str,
+        credentials: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Renew the lease of cached credentials, or generate new ones.
+
+        Renewing keeps the existing database user, which is much cheaper for
+        Vault and the database than creating a new one. New credentials are
+        generated if the lease has no ID or cannot be renewed.
+        """
+        lease_id = credentials.get("lease_id")
+        if lease_id:
+            try:
+                # No increment: Vault sets the new TTL from now, so passing
+                # the (shorter) cache ttl would cut the lease short under
+                # every caller still holding these credentials
+                response = self._vault_call(
+                    self.client.sys.renew_lease, lease_id=lease_id
+                )
+                lease_duration = response.get("lease_duration", 0)
+                if lease_duration > 0:
+                    logger.debug("Renewed lease for database role: %s", role)
+                    self._cache_credentials(
+                        cache_key, credentials, lease_duration, ttl
+                    )
+                    return credentials
+            except Exception as e:
+                logger.debug("Lease renewal failed for database role: %s: %s", role, e)
+
+        return self._fetch_credentials(role, ttl, cache_key)
+
+    def _cache_credentials(
+        self,
+        cache_key: str,
+        credentials: Dict[str, Any],
+        lease_duration: int,
+        ttl: Optional[int],
+    ) -> None:
+        """Cache credentials for ttl, bounded by their lease."""
+        cache_ttl = ttl if ttl and ttl < lease_duration else lease_duration
+
+        # Between the cache TTL and the end of the lease the credentials
+        # are still valid, so they can be served while refreshing
+        self._cache_set(
+            cache_key,
+            credentials,
+            ttl=cache_ttl,
+            stale_ttl=lease_duration - cache_ttl,
+        )
 
     def get_static_credentials(
         self, role: str, ttl: Optional[int] = None
@@ -90,40 +304,50 @@ class DatabaseSecrets:
         Raises:
             SecretNotFoundError: If the role is not found.
         """
-        cache_key = f"db:static:{self.mount_point}:{role}"
+        cache_key = self._static_prefix + role
 
         cached_creds = self.cache.get(cache_key)
+        if cached_creds is _MISS_SENTINEL:
+            raise SecretNotFoundError("Static database role", role)
         if cached_creds is not None:
-            logger.debug(f"Cache hit for static database role: {role}")
+            logger.debug("Cache hit for static database role: %s", role)
             return cached_creds
 
         logger.debug(
-            f"Cache miss for static database role: {role}, fetching from Vault"
+            "Cache miss for static database role: %s, fetching from Vault", role
         )
 
+        return self._inflight.do(
+            cache_key, lambda: self._fetch_static_credentials(role, ttl, cache_key)
+        )
+
+    def _fetch_static_credentials(
+        self, role: str, ttl: Optional[int], cache_key: str
+    ) -> Dict[str, Any]:
+        """Read static credentials from Vault and cache them."""
         try:
-            response = self.client.secrets.database.get_static_credentials(
+            response = self._vault_call(
+                self.client.secrets.database.get_static_credentials,
                 name=role, mount_point=self.mount_point
             )
 
+            data = response["data"]
             credentials = {
-                "username": response["data"]["username"],
-                "password": response["data"]["password"],
-                "last_vault_rotation": response["data"].get("last_vault_rotation"),
-                "rotation_period": response["data"].get("rotation_period"),
+                "username": data["username"],
+                "password": data["password"],
+                "last_vault_rotation": data.get("last_vault_rotation"),
+                "rotation_period": data.get("rotation_period"),
             }
 
-            cache_ttl = ttl or 300
+            cache_ttl = ttl or self._STATIC_DEFAULT_TTL
 
-            self.cache.set(cache_key, credentials, ttl=cache_ttl)
+            self._cache_set(cache_key, credentials, ttl=cache_ttl)
 
             return credentials
 
-        except Exception as e:
-            if "404" in str(e) or "not found" in str(e).lower():
-                raise SecretNotFoundError(f"Static database role not found: {role}")
-            raise
-
+        except InvalidPath:
+            self._cache_miss(cache_key)
+            raise SecretNotFoundError("Static database role", role)
 
     def get_connection_string(
         self,
@@ -148,13 +372,13 @@ class DatabaseSecrets:
         """
         credentials = self.get_credentials(role)
 
-        return template.format(
-            username=credentials["username"],
-            password=credentials["password"],
-            host=host,
-            database=database,
-            **kwargs,
-        )
+        # Fill the kwargs dict in place rather than re-packing everything
+        # into a new one for template.format(**...)
+        kwargs["host"] = host
+        kwargs["database"] = database
+        kwargs["username"] = credentials["username"]
+        kwargs["password"] = credentials["password"]
+        return template.format_map(kwargs)
 
     def clear_cache(self, role: Optional[str] = None) -> None:
         """
@@ -164,15 +388,15 @@ class DatabaseSecrets:
             role: Optional specific role to clear, otherwise clears all database cache.
         """
         if role:
-            self.cache.delete(f"db:{self.mount_point}:{role}")
-            self.cache.delete(f"db:static:{self.mount_point}:{role}")
+            keys_to_delete = [
+                self._dynamic_prefix + role,
+                self._static_prefix + role,
+            ]
+            with self._cache_keys_lock:
+                self._cache_keys.difference_update(keys_to_delete)
         else:
-            import re
-
-            pattern = f"^db:.*:{self.mount_point}:"
-            with self.cache._lock:
-                keys_to_delete = [
-                    key for key in self.cache._cache.keys() if re.match(pattern, key)
-                ]
-                for key in keys_to_delete:
-                    del self.cache._cache[key]
+            with self._cache_keys_lock:
+                keys_to_delete = list(self._cache_keys)
+                self._cache_keys.clear()
+
+        self.cache.delete_many(keys_to_delete)
@@ -1,18 +1,63 @@
 """Key-Value secrets engine with caching."""
 
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+from threading import Lock
 import logging
 
+from hvac.exceptions import Forbidden, InvalidPath
+
 from ..cache import MemoryCache
 from ..utils.exceptions import SecretNotFoundError
+from ..utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Cached in place of secrets Vault reported as missing
+_MISS_SENTINEL = object()
+
+# Size below which the cache key index is never pruned
+_KEY_INDEX_MIN_PRUNE = 256
+
+# Upper bound on concurrent Vault requests made by one batch call
+MAX_BATCH_WORKERS = 16
+
+
+@lru_cache(maxsize=256)
+def _version_suffix(version: int) -> str:
+    """Return the cache key suffix for a secret version."""
+    return f":v{version}"
+
 
 class KVSecrets:
     """Manages Key-Value secrets with caching support."""
 
-    def __init__(self, client, cache: MemoryCache, mount_point: str = "secret"):
+    __slots__ = (
+        "client",
+        "cache",
+        "mount_point",
+        "stale_ttl",
+        "negative_ttl",
+        "_cache_keys",
+        "_cache_keys_lock",
+        "_cache_keys_prune_at",
+        "_inflight",
+        "_kv_prefix",
+        "_list_prefix",
+        "_kv_v2",
+        "_reauthenticate",
+    )
+
+    def __init__(
+        self,
+        client,
+        cache: MemoryCache,
+        mount_point: str = "secret",
+        stale_ttl: int = 0,
+        negative_ttl: int = 10,
+        reauthenticate: Optional[Callable[[Optional[str]], None]] = None,
+    ):
         """
         Initialize KV secrets manager.
 
@@ -20,10 +65,74 @@ class KVSecrets:
             client: The Vault client instance.
             cache: The cache instance to use.
             mount_point: The KV engine mount point.
+            stale_ttl: Seconds after a cached secret expires during which it is
+                still returned while being refreshed in the background.
+            negative_ttl: Seconds to remember that a secret was not found, so
+                repeated reads fail without querying Vault. 0 disables this.
+            reauthenticate: Optional callback invoked with the rejected token
+                when Vault answers 403, before the request is retried once.
         """
         self.client = client
         self.cache = cache
         self.mount_point = mount_point
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        # Keys this instance has written, so clear_cache never scans the cache
+        self._cache_keys: Set[str] = set()
+        self._cache_keys_lock = Lock()
+        self._cache_keys_prune_at = _KEY_INDEX_MIN_PRUNE
+        # Concurrent misses for the same key share one Vault request
+        self._inflight = SingleFlight()
+        # Cache key prefixes, built once so lookups only concatenate the path
+        self._kv_prefix = f"kv:{mount_point}:"
+        self._list_prefix = f"kv:list:{mount_point}:"
+        # Mount version, looked up on first use (see refresh_mount_info)
+        self._kv_v2: Optional[bool] = None
+        self._reauthenticate = reauthenticate
+
+    def _vault_call(self, method: Callable[..., Any], **kwargs) -> Any:
+        """
+        Call a Vault API method, re-authenticating once if the token is rejected.
+
+        Args:
+            method: The hvac method to call.
+            **kwargs: Arguments for the method.
+
+        Returns:
+            The method's response.
+        """
+        token = self.client.token
+        try:
+            return method(**kwargs)
+        except Forbidden:
+            if self._reauthenticate is None:
+                raise
+            self._reauthenticate(token)
+            return method(**kwargs)
+
+    def _cache_set(
+        self, key: str, value: Any, ttl: Optional[int] = None, stale_ttl: int = 0
+    ) -> None:
+        """
+        Store a value in the cache and record its key for clear_cache.
+
+        Keys the cache has since evicted or expired are dropped from the
+        index whenever it doubles in size, so it stays proportional to the
+        number of live entries.
+        """
+        with self._cache_keys_lock:
+            self.cache.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+            self._cache_keys.add(key)
+            if len(self._cache_keys) > self._cache_keys_prune_at:
+                self._cache_keys = {k for k in self._cache_keys if k in self.cache}
+                self._cache_keys_prune_at = max(
+                    2 * len(self._cache_keys), _KEY_INDEX_MIN_PRUNE
+                )
+
+    def _cache_miss(self, key: str) -> None:
+        """Remember that Vault has nothing at key for negative_ttl seconds."""
+        if self.negative_ttl:
+            self._cache_set(key, _MISS_SENTINEL, ttl=self.negative_ttl)
 
     def read(self, path: str, version: Optional[int] = None) -> Dict[str, Any]:
         """
@@ -39,41 +148,98 @@ class KVSecrets:
         Raises:
             SecretNotFoundError: If the secret is not found.
         """
-        cache_key = f"kv:{self.mount_point}:{path}"
+        cache_key = self._kv_prefix + path
         if version:
-            cache_key = f"{cache_key}:v{version}"
+            cache_key += _version_suffix(version)
 
-        cached_value = self.cache.get(cache_key)
+        cached_value, is_stale = self.cache.get_stale(cache_key)
+        if cached_value is _MISS_SENTINEL:
+            raise SecretNotFoundError("Secret", path)
         if cached_value is not None:
-            logger.debug(f"Cache hit for key: {cache_key}")
+            if is_stale:
+                logger.debug("Stale cache hit for key: %s, refreshing", cache_key)
+                self._inflight.submit(
+                    cache_key, lambda: self._fetch(path, version, cache_key)
+                )
+            else:
+                logger.debug("Cache hit for key: %s", cache_key)
             return cached_value
 
-        logger.debug(f"Cache miss for key: {cache_key}, fetching from Vault")
+        logger.debug("Cache miss for key: %s, fetching from Vault", cache_key)
+
+        return self._inflight.do(
+            cache_key, lambda: self._fetch(path, version, cache_key)
+        )
+
+    def mread(self, paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Read the latest version of several secrets.
+
+        Cached secrets are returned directly; the remaining paths are read
+        from Vault concurrently.
 
+        Args:
+            paths: The secret paths.
+
+        Returns:
+            Dictionary mapping each path to its secret data.
+
+        Raises:
+            SecretNotFoundError: If any secret is not found.
+        """
+        paths = list(dict.fromkeys(paths))
+        cached = self.cache.mget(self._kv_prefix + path for path in paths)
+
+        results = {}
+        misses = []
+        for path in paths:
+            value = cached.get(self._kv_prefix + path)
+            if value is None or value is _MISS_SENTINEL:
+                misses.append(path)
+            else:
+                results[path] = value
+
+        if len(misses) == 1:
+            results[misses[0]] = self.read(misses[0])
+        elif misses:
+            with ThreadPoolExecutor(
+                max_workers=min(len(misses), MAX_BATCH_WORKERS)
+            ) as executor:
+                results.update(zip(misses, executor.map(self.read, misses)))
+
+        return results
+
+    def _fetch(self, path: str, version: Optional[int], cache_key: str) -> Dict[str, Any]:
+        """Read a secret from Vault and cache it."""
         try:
             if self._is_kv_v2():
-                response = self.client.secrets.kv.v2.read_secret_version(
+                response = self._vault_call(
+                    self.client.secrets.kv.v2.read_secret_version,
                     path=path,
                     mount_point=self.mount_point,
                     version=version
                 )
-                data = response.get("data", {}).get("data", {})
+                try:
+                    data = response["data"]["data"]
+                except (KeyError, TypeError):
+                    data = {}
             else:
-                response = self.client.secrets.kv.v1.read_secret(
+                response = self._vault_call(
+                    self.client.secrets.kv.v1.read_secret,
                     path=path,
                     mount_point=self.mount_point
                 )
-                data = response.get("data", {})
+                try:
+                    data = response["data"]
+                except (KeyError, TypeError):
+                    data = {}
 
-            self.cache.set(cache_key, data)
+            self._cache_set(cache_key, data, stale_ttl=self.stale_ttl)
             return data
 
-        except Exception as e:
-            if "404" in str(e) or "not found" in str(e).lower():
-                raise SecretNotFoundError(f"Secret not found at path: {path}")
-            raise
-
-
+        except InvalidPath:
+            self._cache_miss(cache_key)
+            raise SecretNotFoundError("Secret", path)
 
     def list_secrets(self, path: str = "") -> list:
         """
@@ -85,34 +251,77 @@ class KVSecrets:
         Returns:
             List of secret keys at the path.
         """
-        cache_key = f"kv:list:{self.mount_point}:{path}"
+        cache_key = self._list_prefix + path
 
         cached_value = self.cache.get(cache_key)
         if cached_value is not None:
             return cached_value
 
         if self._is_kv_v2():
-            response = self.client.secrets.kv.v2.list_secrets(
+            response = self._vault_call(
+                self.client.secrets.kv.v2.list_secrets,
                 path=path,
                 mount_point=self.mount_point
             )
         else:
-            response = self.client.secrets.kv.v1.list_secrets(
+            response = self._vault_call(
+                self.client.secrets.kv.v1.list_secrets,
                 path=path,
                 mount_point=self.mount_point
             )
 
-        keys = response.get("data", {}).get("keys", [])
-        self.cache.set(cache_key, keys, ttl=60)
+        try:
+            keys = response["data"]["keys"]
+        except (KeyError, TypeError):
+            keys = []
+        self._cache_set(cache_key, keys, ttl=60)
         return keys
 
+    def clear_cache(self, path: Optional[str] = None) -> None:
+        """
+        Clear cached secrets.
+
+        Args:
+            path: Optional secret path to clear (all versions), otherwise clears
+                all cached secrets and listings for this mount.
+        """
+        with self._cache_keys_lock:
+            if path is None:
+                keys_to_delete = list(self._cache_keys)
+                self._cache_keys.clear()
+            else:
+                secret_key = self._kv_prefix + path
+                version_prefix = secret_key + ":v"
+                keys_to_delete = [
+                    key for key in self._cache_keys
+                    if key == secret_key or key.startswith(version_prefix)
+                ]
+                self._cache_keys.difference_update(keys_to_delete)
+
+        self.cache.delete_many(keys_to_delete)
+
+    def refresh_mount_info(self) -> None:
+        """Forget the cached mount version, e.g. after the mount is upgraded."""
+        self._kv_v2 = None
+
     def _is_kv_v2(self) -> bool:
-        """Check if the mount point is KV v2."""
+        """
+        Check if the mount point is KV v2.
+
+        The mount version is read from Vault once and remembered. A failed
+        lookup is treated as KV v1 but not remembered, so it is retried.
+        """
+        if self._kv_v2 is not None:
+            return self._kv_v2
+
         try:
-            mount_info = self.client.sys.read_mount_configuration(
+            mount_info = self._vault_call(
+                self.client.sys.read_mount_configuration,
                 path=self.mount_point
             )
-            options = mount_info.get("options", {})
-            return options.get("version", "1") == "2"
         except Exception:
             return False
+
+        options = mount_info.get("options", {})
+        self._kv_v2 = options.get("version", "1") == "2"
+        return self._kv_v2
@@ -6,10 +6,12 @@ from .exceptions import (
     CacheError,
     SecretNotFoundError,
 )
+from .singleflight import SingleFlight
 
 __all__ = [
     "VaultAgentError",
     "AuthenticationError",
     "CacheError",
     "SecretNotFoundError",
+    "SingleFlight",
 ]
\ No newline at end of file
@@ -1,5 +1,7 @@
 """Custom exceptions for PyVault Agent."""
 
+from typing import Optional
+
 
 class VaultAgentError(Exception):
     """Base exception for PyVault Agent errors."""
@@ -17,5 +19,38 @@ class CacheError(VaultAgentError):
 
 
 class SecretNotFoundError(VaultAgentError):
-    """Raised when a secret is not found."""
-    pass
\ No newline at end of file
+    """
+    Raised when a secret is not found.
+
+    The message is only built when the exception is converted to a string,
+    so lookups that catch and ignore misses never format it.
+    """
+
+    def __init__(self, kind: str, name: Optional[str] = None):
+        """
+        Initialize the error.
+
+        Args:
+            kind: What was not found, e.g. "Database role". Used as the whole
+                message when name is not given.
+            name: The name or path that was looked up.
+        """
+        if name is None:
+            super().__init__(kind)
+        else:
+            super().__init__(kind, name)
+
+    @property
+    def kind(self) -> str:
+        """What was not found."""
+        return self.args[0]
+
+    @property
+    def name(self) -> Optional[str]:
+        """The name or path that was looked up, if given."""
+        return self.args[1] if len(self.args) > 1 else None
+
+    def __str__(self) -> str:
+        if len(self.args) > 1:
+            return f"{self.args[0]} not found: {self.args[1]}"
+        return str(self.args[0])
@@ -0,0 +1,133 @@
+# Copyright 2024 Nicholas Jackson
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Request coalescing for concurrent identical calls."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from threading import Event, Lock
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Worker threads shared by background refreshes of one SingleFlight
+BACKGROUND_WORKERS = 4
+
+
+class _Call:
+    """A call in progress and its outcome."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    still running wait for it and receive the same result or exception.
+    """
+
+    __slots__ = ("_calls", "_lock", "_executor")
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls: Dict[str, _Call] = {}
+        self._lock = Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn for key, or wait for the run already in progress.
+
+        Args:
+            key: Identifies calls that can share a result.
+            fn: Function to run if no call for key is in flight.
+
+        Returns:
+            The result of fn.
+
+        Raises:
+            Any exception raised by fn, in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def submit(self, key: str, fn: Callable[[], Any]) -> bool:
+        """
+        Run fn for key on a background thread unless a call is already in flight.
+
+        Callers of do() for the same key while the background call runs wait
+        for it instead of starting their own. Exceptions raised by fn are
+        logged, as there is no caller to receive them.
+
+        Args:
+            key: Identifies calls that can share a result.
+            fn: Function to run.
+
+        Returns:
+            True if a background call was started, False if one was in flight.
+        """
+        with self._lock:
+            if key in self._calls:
+                return False
+            call = _Call()
+            self._calls[key] = call
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=BACKGROUND_WORKERS,
+                    thread_name_prefix="vault-agent-refresh",
+                )
+            executor = self._executor
+
+        executor.submit(self._run_background, key, call, fn)
+        return True
+
+    def _run_background(self, key: str, call: _Call, fn: Callable[[], Any]) -> None:
+        """Run a call submitted by submit() and release its waiters."""
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            logger.warning("Background refresh failed for %s: %s", key, e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()